@@ -0,0 +1,79 @@
+"""
+Compare the targeted extractor with the BeautifulSoup + regex path on saved pages.
+
+    python bench_extractor.py [--repeat 20] [page.html ...]
+"""
+import argparse
+import html
+import json
+import re
+import time
+
+from extractor import extract_fare_cells, extract_flight_data
+
+DEFAULT_PAGES = [
+    "flight_select_page_20250615_144220.html",
+    "debug_page_source.html",
+]
+
+
+def soup_extract(page_source):
+    """The previous approach: parse the whole page, find the script, regex the payload."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_source, 'html.parser')
+    data_script = soup.find('script', string=re.compile(r'var\s+model\s*=\s*|FlightData\s*='))
+    if not data_script:
+        return None
+    match = re.search(r'var\s+model\s*=\s*(\{.*?\});', data_script.string, re.DOTALL)
+    if match:
+        return json.loads(match.group(1))
+    match = re.search(r"FlightData\s*=\s*'(.*?)';", data_script.string, re.DOTALL)
+    return json.loads(html.unescape(match.group(1))) if match else None
+
+
+def time_call(fn, arg, repeat):
+    """Best-of-``repeat`` wall time in milliseconds, plus the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flight data extraction.")
+    parser.add_argument("pages", nargs="*", default=DEFAULT_PAGES)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        import bs4  # noqa: F401
+        have_soup = True
+    except ImportError:
+        have_soup = False
+        print("BeautifulSoup not installed; skipping the soup baseline.")
+
+    for path in args.pages:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        text = raw.decode('utf-8')
+        print(f"\n{path} ({len(raw) / 1e6:.2f} MB)")
+
+        ms, extracted = time_call(extract_flight_data, raw, args.repeat)
+        layout = extracted[0] if extracted else None
+        print(f"  extractor (bytes):   {ms:8.2f} ms  layout={layout}")
+        ms, _ = time_call(extract_flight_data, text, args.repeat)
+        print(f"  extractor (str):     {ms:8.2f} ms")
+        ms, cells = time_call(extract_fare_cells, raw, args.repeat)
+        print(f"  extractor + cells:   {ms:8.2f} ms  cells={len(cells or [])}")
+
+        if have_soup:
+            ms, data = time_call(soup_extract, text, max(1, args.repeat // 5))
+            print(f"  soup + regex:        {ms:8.2f} ms  found={data is not None}")
+
+
+if __name__ == '__main__':
+    main()
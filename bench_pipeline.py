@@ -0,0 +1,160 @@
+"""
+Offline benchmark and regression check for the browser-free stages of a search.
+
+    python bench_pipeline.py                 # table for the saved captures
+    python bench_pipeline.py --json out.json # machine-readable results for CI
+    python bench_pipeline.py --check         # exit 1 if extraction regressed
+
+Stages timed per page: content detection, script location, JSON extraction and
+fare normalization, plus end-to-end InternalSelect -> Select -> fares through a
+local stand-in server (no network).
+"""
+import argparse
+import gc
+import http.cookiejar
+import json
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+from block_classifier import classify_block
+from extractor import (
+    LAYOUT_FLIGHT_DATA,
+    extract_fare_cells,
+    fare_cells_from_flight_data,
+    find_flight_data_payload,
+)
+from fare_store import fare_records_from_cells
+from readiness import NO_FLIGHTS_PHRASES
+from stand_in_server import start_stand_in_server
+
+# Saved captures and what extraction must still find in them
+FIXTURES = {
+    "flight_select_page_20250615_144220.html": {"cells": 48, "flights": 8},
+    "debug_page_source.html": {"cells": 48, "flights": 8},
+}
+
+
+def detect_content(page_source):
+    """What the page-level checks do: the block-page classifier, then the no-flights phrases."""
+    blocked = classify_block(page_source)
+    lowered = page_source.lower()
+    return {
+        "no_flights": any(p in lowered for p in NO_FLIGHTS_PHRASES),
+        "captcha": blocked is not None,
+    }
+
+
+def normalize(data):
+    """Fare cells plus the FareRecords they become, as a search and its history write would."""
+    cells, _ = fare_cells_from_flight_data(LAYOUT_FLIGHT_DATA, data)
+    fare_records_from_cells("JFK", "ATL", "2025-07-15", cells)
+    return cells
+
+
+def measure(fn, *args, repeat=10):
+    """
+    Run ``fn(*args)`` and report best wall time, peak traced memory and net allocated blocks.
+
+    Returns:
+        A (result, metrics) tuple.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    kept = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks_before
+    del kept
+    return result, {"ms": best * 1000, "peak_kb": peak / 1024, "blocks": blocks}
+
+
+def bench_page(path, repeat):
+    with open(path, "r", encoding="utf-8") as f:
+        page = f.read()
+
+    stages = {}
+    _, stages["detect"] = measure(detect_content, page, repeat=repeat)
+    payload, stages["locate"] = measure(find_flight_data_payload, page, repeat=repeat)
+    data, stages["json"] = measure(json.loads, payload, repeat=repeat)
+    cells, stages["normalize"] = measure(normalize, data, repeat=repeat)
+    observed = {
+        "cells": len(cells or []),
+        "flights": sum(len(j.get("flights") or []) for j in data.get("journeys", [])),
+    }
+    return {"bytes": len(page.encode("utf-8")), "stages": stages, "observed": observed}
+
+
+def bench_end_to_end(path, repeat):
+    """InternalSelect -> 302 -> Select -> fare cells through a local stand-in server."""
+    server, base_url = start_stand_in_server(path)
+    url = f"{base_url}/Flight/InternalSelect?o1=JFK&d1=ATL&dd1=Jul+15%2C+2025&ADT=1&mon=true&promo=&ftype=DD"
+    try:
+        def search():
+            opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+            with opener.open(url, timeout=10) as response:
+                if "/Flight/Select" not in response.geturl():
+                    raise RuntimeError(f"Redirect chain ended at {response.geturl()}")
+                return extract_fare_cells(response.read())
+
+        cells, metrics = measure(search, repeat=repeat)
+        metrics["cells"] = len(cells or [])
+        return metrics
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the browser-free search stages on saved pages.")
+    parser.add_argument("pages", nargs="*", default=list(FIXTURES))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    parser.add_argument("--check", action="store_true", help="Fail if extraction results regressed")
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    for path in args.pages:
+        page_result = bench_page(path, args.repeat)
+        page_result["end_to_end"] = bench_end_to_end(path, args.repeat)
+        results[path] = page_result
+
+        print(f"\n{path} ({page_result['bytes'] / 1e6:.2f} MB)")
+        print(f"  {'stage':<12}{'ms':>10}{'peak KB':>12}{'blocks':>10}")
+        for stage, m in list(page_result["stages"].items()) + [("end_to_end", page_result["end_to_end"])]:
+            print(f"  {stage:<12}{m['ms']:>10.2f}{m['peak_kb']:>12.1f}{m['blocks']:>10}")
+        print(f"  extracted: {page_result['observed']}")
+
+        expected = FIXTURES.get(path)
+        if expected:
+            for key, value in expected.items():
+                if page_result["observed"].get(key) != value:
+                    failures.append(f"{path}: expected {key}={value}, got {page_result['observed'].get(key)}")
+            if page_result["end_to_end"]["cells"] != expected["cells"]:
+                failures.append(f"{path}: end-to-end returned {page_result['end_to_end']['cells']} cells")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+    if args.check:
+        if failures:
+            print("\n❌ Regression check failed:")
+            for failure in failures:
+                print(f"  - {failure}")
+            sys.exit(1)
+        print("\n✅ Regression check passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import re
+
+# Only the start of a document is scanned: block pages are small and put their
+# challenge near the top, while real Select pages run to ~1.8 MB.
+BLOCK_SCAN_PREFIX = 64 * 1024
+
+# Signals that a page is a bot-protection block or challenge, not search results.
+# The PerimeterX sensor script (px-cloud, _pxAppId) also loads on real pages, so
+# only the challenge itself counts.
+BLOCK_URL_SIGNALS = [
+    "captcha", "/blocked", "validate.perimeterx", "captcha-delivery", "_incapsula_", "/cdn-cgi/challenge",
+]
+BLOCK_TITLE_SIGNALS = [
+    "access to this page has been denied", "access denied", "attention required", "just a moment",
+    "pardon our interruption", "are you a robot", "security check", "captcha",
+]
+BLOCK_BODY_SIGNALS = [
+    "px-captcha", "g-recaptcha", "recaptcha/api.js", "hcaptcha.com", "captcha-delivery",
+    "challenge-form", "cf-chl-", "verify you are human", "prove you are not a robot",
+    "press & hold", "press &amp; hold", "security check", "access to this page has been denied",
+]
+
+
+def _compile(signals):
+    # One alternation over lowercase literals scans the (lowercased) text once in C
+    # for every signal, so adding signals does not add passes. Lowercasing the
+    # bounded prefix first is several times faster than re.IGNORECASE.
+    return re.compile("|".join(re.escape(s.lower()) for s in sorted(signals, key=len, reverse=True)))
+
+
+_URL_RE = _compile(BLOCK_URL_SIGNALS)
+_TITLE_RE = _compile(BLOCK_TITLE_SIGNALS)
+_BODY_RE = _compile(BLOCK_BODY_SIGNALS)
+_BODY_RE_BYTES = re.compile(_BODY_RE.pattern.encode())
+
+
+def classify_block(page=None, url=None, title=None, prefix=BLOCK_SCAN_PREFIX):
+    """
+    Decide whether a page is a CAPTCHA / block page.
+
+    Cheap signals go first: the URL and the title, then one pass over the first
+    ``prefix`` characters of the document.
+
+    Args:
+        page (str or bytes): Document HTML (or just its prefix); None to skip the body check.
+        url (str): Current URL.
+        title (str): Document title.
+        prefix (int): Maximum number of characters of ``page`` to scan.
+
+    Returns:
+        A short reason such as "title: access to this page has been denied",
+        or None when nothing points to a block page.
+    """
+    if url:
+        match = _URL_RE.search(url.lower())
+        if match:
+            return f"url: {match.group(0)}"
+    if title:
+        match = _TITLE_RE.search(title.lower())
+        if match:
+            return f"title: {match.group(0)}"
+    if page:
+        pattern = _BODY_RE_BYTES if isinstance(page, bytes) else _BODY_RE
+        match = pattern.search(page[:prefix].lower())
+        if match:
+            found = match.group(0)
+            return f"page: {found.decode() if isinstance(found, bytes) else found}"
+    return None
@@ -0,0 +1,226 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Origins whose cookies and storage are wiped between leases
+DEFAULT_RESET_ORIGINS = [
+    "https://booking.flyfrontier.com",
+    "https://www.flyfrontier.com",
+]
+
+
+class BrowserPool:
+    """
+    A bounded pool of warm, already-stealthed Chrome drivers.
+
+    Drivers are created lazily by ``driver_factory`` (or eagerly via ``warm()``),
+    handed out with ``lease()``, scrubbed of cookies and storage when they come
+    back, and recycled after ``max_uses`` leases or whenever a lease ends with
+    an exception (e.g. CaptchaDetectedException), so a flagged browser never
+    serves another search.
+    """
+
+    def __init__(self, driver_factory, size=2, max_uses=20, reset_origins=None):
+        """
+        Args:
+            driver_factory (callable): Zero-argument callable returning a ready-to-use driver.
+            size (int): Maximum number of live drivers in the pool.
+            max_uses (int): Number of leases after which a driver is replaced.
+            reset_origins (list): Origins whose storage is cleared between leases.
+        """
+        if size < 1:
+            raise ValueError("BrowserPool size must be at least 1")
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_uses = max_uses
+        self.reset_origins = reset_origins if reset_origins is not None else DEFAULT_RESET_ORIGINS
+
+        self._idle = []
+        self._uses = {}
+        self._holders = {}  # thread ident -> driver it holds through lease()
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def warm(self, count=None):
+        """
+        Start drivers up front so the first searches skip Chrome startup.
+
+        Args:
+            count (int): How many drivers to start (default: the pool size).
+        """
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._cond:
+                if self._closed or self._live >= count:
+                    return
+                self._live += 1
+            driver = self._create()
+            if driver is None:
+                return
+            with self._cond:
+                self._idle.append(driver)
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """
+        Take a driver out of the pool, starting a new one if there is room.
+
+        Args:
+            timeout (float): Seconds to wait for a free driver (None waits forever).
+
+        Returns:
+            A webdriver instance.
+
+        Raises:
+            TimeoutError: When no driver became available within ``timeout``.
+            RuntimeError: When the pool has been closed.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("BrowserPool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._live < self.size:
+                    self._live += 1
+                    break
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No browser available within {timeout}s")
+                self._cond.wait(remaining)
+
+        driver = self._create()
+        if driver is None:
+            raise RuntimeError("Failed to start a browser for the pool")
+        return driver
+
+    def release(self, driver, recycle=False):
+        """
+        Return a driver to the pool.
+
+        Args:
+            driver: A driver previously obtained from ``acquire()``.
+            recycle (bool): Quit the driver instead of reusing it (e.g. after a CAPTCHA).
+        """
+        uses = self._uses.get(id(driver), 0) + 1
+        self._uses[id(driver)] = uses
+
+        if not recycle and uses >= self.max_uses:
+            print(f"♻️  Recycling browser after {uses} uses")
+            recycle = True
+
+        if not recycle:
+            recycle = not self._reset(driver)
+
+        if recycle or self._closed:
+            self._discard(driver)
+            return
+
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        Context manager around ``acquire()``/``release()``.
+
+        Any exception escaping the block recycles the driver, so a browser that
+        hit a CAPTCHA or crashed is never handed out again.
+        """
+        driver = self.acquire(timeout=timeout)
+        thread_id = threading.get_ident()
+        with self._cond:
+            self._holders[thread_id] = driver
+        try:
+            yield driver
+        except BaseException:
+            self._unhold(thread_id)
+            self.release(driver, recycle=True)
+            raise
+        self._unhold(thread_id)
+        self.release(driver)
+
+    def _unhold(self, thread_id):
+        # Before release(), so abort() cannot reach a driver after it went back to the pool.
+        # It says nothing about this thread's *next* lease; callers tie a thread to a job.
+        with self._cond:
+            self._holders.pop(thread_id, None)
+
+    def abort(self, thread_id):
+        """
+        Quit the driver that thread ``thread_id`` holds through ``lease()``, if any.
+
+        The thread's in-flight browser command fails, its search returns, and the
+        dead driver is discarded when the lease ends, freeing the slot for a new one.
+        The caller must make sure the thread is still on the work it means to abort
+        (search_many holds the lock its jobs need to finish while it calls this).
+
+        Returns:
+            True if a driver was aborted.
+        """
+        with self._cond:
+            driver = self._holders.pop(thread_id, None)
+        if driver is None:
+            return False
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        return True
+
+    def close(self):
+        """Quit every idle driver and refuse further leases."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _create(self):
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            print(f"❌ Failed to start pooled browser: {e}")
+            driver = None
+        if driver is None:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            return None
+        self._uses[id(driver)] = 0
+        return driver
+
+    def _reset(self, driver):
+        """Clear cookies and web storage; returns False if the driver looks dead."""
+        try:
+            driver.delete_all_cookies()
+            for origin in self.reset_origins:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                    "origin": origin,
+                    "storageTypes": "cookies,local_storage,session_storage,indexeddb,cache_storage,service_workers",
+                })
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"⚠️  Could not reset pooled browser, recycling it: {e}")
+            return False
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
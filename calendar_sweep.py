@@ -0,0 +1,191 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from extractor import (
+    extract_flight_data,
+    extract_flight_data_in_browser,
+    fare_cells_from_flight_data,
+    ribbon_low_fares,
+)
+from main import (
+    FRONTIER_BASE_URL,
+    ROTATING_PROXY_ENDPOINT,
+    build_internal_select_url,
+    create_stealth_driver,
+    load_select_page,
+)
+from readiness import PhaseTimer
+
+# The ribbon shows the searched day and three days either side of it
+RIBBON_HALF_WIDTH = 3
+
+# Where a calendar entry came from
+SOURCE_PAGE = "page"      # the Select page for that date was loaded: full fare cells
+SOURCE_RIBBON = "ribbon"  # only the ribbon's lowest fare, seen on a neighbouring date's page
+
+# One date of a sweep. fares is None for ribbon-only entries and days without flights.
+CalendarDay = namedtuple('CalendarDay', ['date', 'low_fare', 'fares', 'source'])
+
+
+def ribbon_url(key, base_url=FRONTIER_BASE_URL, fare_type='DD'):
+    """InternalSelect URL for a ribbon key ('s=true&o1=JFK&d1=ATL&dd1=2025-07-12&...')."""
+    return f"{base_url}/Flight/InternalSelect?{key}&ftype={fare_type}"
+
+
+def browser_fetcher(driver, proxy_server=None, timer=None):
+    """
+    Page fetcher that moves one already-open browser from date to date.
+
+    Returns:
+        A callable ``fetch(url, date_str)`` returning ``(layout, data)`` or None.
+    """
+    timer = timer or PhaseTimer()
+
+    def fetch(url, date_str):
+        if not load_select_page(driver, url, date_str, proxy_server=proxy_server, timer=timer):
+            return None
+        with timer.phase("extract"):
+            return extract_flight_data_in_browser(driver) or extract_flight_data(driver.page_source)
+    return fetch
+
+
+def http_fetcher(http_session):
+    """
+    Page fetcher over an established HttpSearchSession (see http_session.py).
+
+    Returns:
+        A callable ``fetch(url, date_str)`` returning ``(layout, data)`` or None.
+    """
+    def fetch(url, date_str):
+        return extract_flight_data(http_session.fetch_url(url))
+    return fetch
+
+
+def _date_range(start_date, days):
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    return [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)]
+
+
+def _low_fare(fare_cells):
+    prices = [c['priceSpecification']['totalPrice'] for c in fare_cells or []
+              if not c.get('isSoldOut') and c['priceSpecification'].get('totalPrice') is not None]
+    return min(prices) if prices else None
+
+
+def sweep_calendar(fetch, origin, destination, start_date, days=30, fare_type='DD', full=False,
+                   calendar=None, base_url=FRONTIER_BASE_URL):
+    """
+    Fill a date -> fares calendar for one route from as few page loads as possible.
+
+    Every Select page carries a ribbon with the lowest fare for the surrounding
+    days. By default only every seventh date is loaded (centred so its ribbon
+    covers the days around it) and the rest are filled from ribbons, so a
+    30-day sweep takes about five page loads on one session. With ``full=True``
+    every date is loaded for its fare cells, still moving the same session
+    along the ribbon links instead of starting a new search.
+
+    Args:
+        fetch (callable): ``fetch(url, date_str)`` returning ``(layout, data)`` or None,
+                          e.g. from browser_fetcher or http_fetcher.
+        origin (str): The 3-letter IATA code for the origin airport.
+        destination (str): The 3-letter IATA code for the destination airport.
+        start_date (str): First departure date in 'YYYY-MM-DD' format.
+        days (int): Number of consecutive dates to cover.
+        fare_type (str): 'DD' for Discount Den fares, 'STD' for Standard.
+        full (bool): Load every date's page instead of relying on ribbon fares.
+        calendar (dict): Dict to fill in place (default: a new one).
+        base_url (str): Scheme and host to search against.
+
+    Yields:
+        ``(date_str, CalendarDay)`` as each date is filled. Page results replace
+        ribbon entries for the same date; ``calendar`` holds the latest entry per date.
+
+    Raises:
+        CaptchaDetectedException: When the session gets blocked; entries filled so far stay in ``calendar``.
+    """
+    calendar = {} if calendar is None else calendar
+    dates = _date_range(start_date, days)
+    in_range = set(dates)
+    links = {}  # date -> ribbon key that selects it from the current session
+    pending = list(dates)
+
+    while pending:
+        first = datetime.strptime(pending[0], '%Y-%m-%d')
+        if full:
+            target = pending[0]
+        else:
+            # Load the latest pending date within reach so its ribbon also covers pending[0]
+            reach = (first + timedelta(days=RIBBON_HALF_WIDTH)).strftime('%Y-%m-%d')
+            target = max(d for d in pending if d <= reach)
+        pending.remove(target)
+
+        if target in links:
+            url = ribbon_url(links[target], base_url=base_url, fare_type=fare_type)
+        else:
+            url = build_internal_select_url(origin, destination, target, base_url=base_url, fare_type=fare_type)
+        print(f"📅 {origin}→{destination} {target} ({len(pending)} dates left)")
+        extracted = fetch(url, target)
+
+        if extracted is None:
+            calendar[target] = CalendarDay(target, None, None, SOURCE_PAGE)
+            yield target, calendar[target]
+            continue
+
+        fare_cells, _ = fare_cells_from_flight_data(*extracted)
+        ribbon = ribbon_low_fares(*extracted)
+        ribbon_fare = next((fare for date_str, fare, _ in ribbon if date_str == target), None)
+        low_fare = _low_fare(fare_cells)
+        calendar[target] = CalendarDay(target, low_fare if low_fare is not None else ribbon_fare,
+                                       fare_cells, SOURCE_PAGE)
+        yield target, calendar[target]
+
+        for date_str, fare, key in ribbon:
+            if key:
+                links[date_str] = key
+            if date_str not in in_range or date_str == target:
+                continue
+            existing = calendar.get(date_str)
+            if existing is not None and existing.source == SOURCE_PAGE:
+                continue
+            calendar[date_str] = CalendarDay(date_str, fare, None, SOURCE_RIBBON)
+            if not full and date_str in pending:
+                pending.remove(date_str)
+            yield date_str, calendar[date_str]
+
+
+def search_calendar(origin, destination, start_date, days=30, use_proxy=True, full=False, fare_type='DD',
+                    driver=None):
+    """
+    Sweep a date range for one route in a single browser session.
+
+    Args:
+        origin (str): The 3-letter IATA code for the origin airport.
+        destination (str): The 3-letter IATA code for the destination airport.
+        start_date (str): First departure date in 'YYYY-MM-DD' format.
+        days (int): Number of consecutive dates to cover.
+        use_proxy (bool): Whether to use the rotating proxy endpoint.
+        full (bool): Load every date's page instead of relying on ribbon fares.
+        fare_type (str): 'DD' for Discount Den fares, 'STD' for Standard.
+        driver: An already-stealthed driver to use (left open); otherwise one is started and closed.
+
+    Returns:
+        A dict mapping 'YYYY-MM-DD' to CalendarDay, holding whatever was filled
+        before the sweep finished or was blocked.
+    """
+    proxy_server = ROTATING_PROXY_ENDPOINT if use_proxy else None
+    owns_driver = driver is None
+    if owns_driver:
+        driver = create_stealth_driver(proxy_server)
+    calendar = {}
+    timer = PhaseTimer()
+    try:
+        for _ in sweep_calendar(browser_fetcher(driver, proxy_server, timer), origin, destination, start_date,
+                                days=days, fare_type=fare_type, full=full, calendar=calendar):
+            pass
+    except Exception as e:
+        print(f"⚠️  Calendar sweep stopped after {len(calendar)} dates: {e}")
+    finally:
+        if owns_driver:
+            driver.quit()
+        print(f"⏱️  Phase timings: {timer.summary()}")
+    return calendar
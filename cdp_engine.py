@@ -0,0 +1,386 @@
+"""
+Many isolated searches inside one headless Chrome, driven directly over the DevTools protocol.
+
+Each search gets its own incognito browser context (cookies, cache, proxy) and a
+user agent from USER_AGENTS, so one Chrome process replaces a webdriver.Chrome
+per concurrent search. Requires the optional ``websockets`` package.
+
+    import asyncio
+    from cdp_engine import CdpEngine
+
+    async def main():
+        async with CdpEngine(max_contexts=8) as engine:
+            results = await asyncio.gather(*(engine.search("JFK", dest, "2025-07-15")
+                                             for dest in ("ATL", "MCO", "DEN")))
+    asyncio.run(main())
+"""
+import asyncio
+import functools
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from main import (
+    LIGHTWEIGHT_BLOCKED_URLS,
+    LIGHTWEIGHT_JS_HEAP_MB,
+    LIGHTWEIGHT_RENDERER_LIMIT,
+    ROTATING_PROXY_ENDPOINT,
+    USER_AGENTS,
+    search_frontier_flights,
+)
+from readiness import PacingPolicy
+
+CHROME_CANDIDATES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+DEVTOOLS_URL_RE = re.compile(r"DevTools listening on (ws://\S+)")
+
+# Seconds to wait for a CDP reply before treating the call as failed
+COMMAND_TIMEOUT = 60
+
+# What selenium_stealth would patch, applied before any page script runs
+STEALTH_JS = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+Object.defineProperty(navigator, 'platform', {get: () => 'Win32'});
+Object.defineProperty(navigator, 'vendor', {get: () => 'Google Inc.'});
+window.chrome = window.chrome || {runtime: {}};
+"""
+
+
+class CdpError(Exception):
+    """A DevTools command returned an error."""
+    pass
+
+
+def find_chrome():
+    """Path of the Chrome binary: $CHROME_BINARY, else the first candidate on PATH."""
+    override = os.environ.get("CHROME_BINARY")
+    if override:
+        return override
+    for name in CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise FileNotFoundError(f"Chrome not found (tried {', '.join(CHROME_CANDIDATES)}); set CHROME_BINARY")
+
+
+class CdpConnection:
+    """One websocket to the browser, multiplexing commands for every attached target session."""
+
+    def __init__(self, websocket):
+        self._ws = websocket
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._reader = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        try:
+            async for message in self._ws:
+                reply = json.loads(message)
+                future = self._pending.pop(reply.get('id'), None)
+                if future is None or future.done():
+                    continue  # events are not used
+                if 'error' in reply:
+                    future.set_exception(CdpError(reply['error'].get('message', reply['error'])))
+                else:
+                    future.set_result(reply.get('result', {}))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CdpError("DevTools connection closed"))
+            self._pending.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT):
+        command_id = next(self._ids)
+        message = {'id': command_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = future
+        await self._ws.send(json.dumps(message))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(command_id, None)
+
+    async def close(self):
+        await self._ws.close()
+        self._reader.cancel()
+
+
+class CdpTab:
+    """A page inside its own browser context; closing it disposes the context and its cookies."""
+
+    def __init__(self, connection, context_id, target_id, session_id):
+        self.connection = connection
+        self.context_id = context_id
+        self.target_id = target_id
+        self.session_id = session_id
+
+    async def send(self, method, params=None):
+        return await self.connection.send(method, params, session_id=self.session_id)
+
+    async def navigate(self, url):
+        result = await self.send("Page.navigate", {'url': url})
+        if result.get('errorText'):
+            raise CdpError(f"Navigation to {url} failed: {result['errorText']}")
+
+    async def evaluate(self, script, *args):
+        """Run a WebDriver-style script body (``arguments[i]``, ``return``) and return its value."""
+        expression = f"(function() {{ {script} }}).apply(null, {json.dumps(list(args))})"
+        result = await self.send("Runtime.evaluate", {'expression': expression, 'returnByValue': True})
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            raise CdpError(details.get('exception', {}).get('description') or details.get('text'))
+        return result.get('result', {}).get('value')
+
+    async def close(self):
+        try:
+            await self.connection.send("Target.closeTarget", {'targetId': self.target_id})
+        finally:
+            await self.connection.send("Target.disposeBrowserContext", {'browserContextId': self.context_id})
+
+
+class CdpTabDriver:
+    """
+    The slice of the selenium WebDriver API the search code uses, backed by a CdpTab.
+
+    Calls are made from a worker thread and run on the engine's event loop, so
+    search_frontier_flights and load_select_page work unchanged.
+    """
+
+    def __init__(self, tab, loop):
+        self.tab = tab
+        self._loop = loop
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def get(self, url):
+        self._run(self.tab.navigate(url))
+
+    def execute_script(self, script, *args):
+        return self._run(self.tab.evaluate(script, *args))
+
+    def execute_cdp_cmd(self, method, params):
+        return self._run(self.tab.send(method, params))
+
+    @property
+    def page_source(self):
+        return self.execute_script("return document.documentElement.outerHTML;")
+
+    @property
+    def current_url(self):
+        return self.execute_script("return location.href;")
+
+    @property
+    def title(self):
+        return self.execute_script("return document.title;")
+
+    def get_cookies(self):
+        return self.execute_cdp_cmd("Network.getCookies", {}).get('cookies', [])
+
+    def delete_all_cookies(self):
+        self.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+    def quit(self):
+        # The engine owns the context; it is disposed when the search finishes
+        pass
+
+
+class CdpEngine:
+    """
+    One headless Chrome hosting up to ``max_contexts`` concurrent, isolated searches.
+
+    Use as an async context manager (or call ``start()`` / ``close()``). ``search()``
+    has the same arguments and return value as search_frontier_flights.
+    """
+
+    def __init__(self, max_contexts=8, chrome_path=None, lightweight=True, startup_timeout=30):
+        """
+        Args:
+            max_contexts (int): Searches (browser contexts) running at once.
+            chrome_path (str): Chrome binary (default: find_chrome()).
+            lightweight (bool): Block images, fonts, media and third-party hosts in every context
+                                and cap the renderer heap, as create_stealth_driver(lightweight=True).
+            startup_timeout (float): Seconds to wait for Chrome's DevTools endpoint.
+        """
+        self.max_contexts = max_contexts
+        self.chrome_path = chrome_path
+        self.lightweight = lightweight
+        self.startup_timeout = startup_timeout
+        self.connection = None
+        self._process = None
+        self._profile_dir = None
+        self._slots = None
+        # One thread per context: the loop's default executor is capped at min(32, cpus + 4)
+        self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Launch Chrome and connect to its DevTools websocket."""
+        try:
+            import websockets
+        except ImportError as e:
+            raise ImportError("CdpEngine needs the websockets package (pip install websockets)") from e
+
+        self._profile_dir = tempfile.mkdtemp(prefix="cdp-engine-")
+        args = [
+            self.chrome_path or find_chrome(),
+            "--headless=new",
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self._profile_dir}",
+            "--window-size=1920,1080",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-blink-features=AutomationControlled",
+            "--disable-dev-shm-usage",
+            "--no-sandbox",
+            "--disable-background-timer-throttling",
+            "--disable-renderer-backgrounding",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-sync",
+            "--mute-audio",
+        ]
+        if self.lightweight:
+            args += [f"--js-flags=--max-old-space-size={LIGHTWEIGHT_JS_HEAP_MB}",
+                     f"--renderer-process-limit={LIGHTWEIGHT_RENDERER_LIMIT * self.max_contexts}",
+                     "--disable-extensions"]
+        args.append("about:blank")
+
+        self._process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+        websocket_url = await asyncio.wait_for(self._devtools_url(), self.startup_timeout)
+        websocket = await websockets.connect(websocket_url, max_size=None)
+        self.connection = CdpConnection(websocket)
+        self._slots = asyncio.Semaphore(self.max_contexts)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_contexts, thread_name_prefix="cdp-search")
+        print(f"🧩 CDP engine ready ({self.max_contexts} contexts in one Chrome)")
+
+    async def _devtools_url(self):
+        while True:
+            line = await self._process.stderr.readline()
+            if not line:
+                raise RuntimeError("Chrome exited before exposing DevTools")
+            match = DEVTOOLS_URL_RE.search(line.decode(errors='replace'))
+            if match:
+                # Keep draining stderr so Chrome never blocks on a full pipe
+                asyncio.ensure_future(self._drain_stderr())
+                return match.group(1)
+
+    async def _drain_stderr(self):
+        while await self._process.stderr.readline():
+            pass
+
+    async def new_tab(self, proxy_server=None, user_agent=None):
+        """
+        Open a page in a fresh incognito context.
+
+        Args:
+            proxy_server (str): Proxy for this context only ("host:port"), or None for direct.
+            user_agent (str): User agent (default: a random entry from USER_AGENTS).
+
+        Returns:
+            A CdpTab; ``await tab.close()`` disposes the context.
+        """
+        params = {'disposeOnDetach': True}
+        if proxy_server:
+            params['proxyServer'] = f"http://{proxy_server}"
+        context_id = (await self.connection.send("Target.createBrowserContext", params))['browserContextId']
+        target_id = (await self.connection.send("Target.createTarget",
+                                                {'url': 'about:blank', 'browserContextId': context_id}))['targetId']
+        session_id = (await self.connection.send("Target.attachToTarget",
+                                                 {'targetId': target_id, 'flatten': True}))['sessionId']
+        tab = CdpTab(self.connection, context_id, target_id, session_id)
+
+        await tab.send("Page.enable")
+        await tab.send("Network.enable")
+        await tab.send("Network.setUserAgentOverride", {'userAgent': user_agent or random.choice(USER_AGENTS),
+                                                        'acceptLanguage': 'en-US,en', 'platform': 'Win32'})
+        await tab.send("Page.addScriptToEvaluateOnNewDocument", {'source': STEALTH_JS})
+        if self.lightweight:
+            await tab.send("Network.setBlockedURLs", {'urls': LIGHTWEIGHT_BLOCKED_URLS})
+        return tab
+
+    async def search(self, origin, destination, date_str, use_proxy=True, proxy_server=None, user_agent=None,
+                     **kwargs):
+        """
+        Run search_frontier_flights in its own context of the shared Chrome.
+
+        Args:
+            origin (str): The 3-letter IATA code for the origin airport.
+            destination (str): The 3-letter IATA code for the destination airport.
+            date_str (str): The departure date in 'YYYY-MM-DD' format.
+            use_proxy (bool): Whether to use the rotating proxy endpoint.
+            proxy_server (str): Specific proxy for this search ("host:port").
+            user_agent (str): User agent for this search (default: random from USER_AGENTS).
+            **kwargs: Passed to search_frontier_flights (fare_type, return_date, passengers, pacing, timer...).
+
+        Returns:
+            A list of fare dictionaries, or None if the search fails.
+
+        Raises:
+            CaptchaDetectedException: When the context is served a block page.
+        """
+        if use_proxy and not proxy_server:
+            proxy_server = ROTATING_PROXY_ENDPOINT
+        kwargs.setdefault('pacing', PacingPolicy(close_delay=0))
+        async with self._slots:
+            tab = await self.new_tab(proxy_server if use_proxy else None, user_agent)
+            try:
+                loop = asyncio.get_running_loop()
+                driver = CdpTabDriver(tab, loop)
+                search = functools.partial(search_frontier_flights, origin, destination, date_str,
+                                           use_proxy=use_proxy, proxy_server=proxy_server, driver=driver,
+                                           **kwargs)
+                return await loop.run_in_executor(self._executor, search)
+            finally:
+                try:
+                    await tab.close()
+                except CdpError as e:
+                    print(f"⚠️  Could not dispose browser context: {e}")
+
+    async def close(self):
+        if self.connection is not None:
+            try:
+                await self.connection.send("Browser.close", timeout=5)
+            except Exception:
+                pass
+            await self.connection.close()
+            self.connection = None
+        if self._process is not None:
+            if self._process.returncode is None:
+                self._process.terminate()
+            await self._process.wait()
+            self._process = None
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def search_many_in_one_browser(jobs, max_contexts=8, use_proxy=True, **kwargs):
+    """
+    Run (origin, destination, date) jobs concurrently in one Chrome and wait for all of them.
+
+    Returns:
+        A list of (job, fares_or_exception) pairs in job order.
+    """
+    async def run():
+        async with CdpEngine(max_contexts=max_contexts) as engine:
+            results = await asyncio.gather(*(engine.search(*job, use_proxy=use_proxy, **kwargs) for job in jobs),
+                                           return_exceptions=True)
+        return list(zip(jobs, results))
+    return asyncio.run(run())
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from fare_cache import cache_key
+
+# Kinds of FareChange
+CHANGE_PRICE = "price"              # a fare's price moved
+CHANGE_SOLD_OUT = "sold_out"        # a fare that was bookable is gone
+CHANGE_AVAILABLE = "available"      # a sold-out (or new) fare became bookable
+CHANGE_NEW_GOWILD = "new_gowild"    # a GoWild seat appeared where there was none
+CHANGE_FLIGHT_ADDED = "flight_added"
+CHANGE_FLIGHT_REMOVED = "flight_removed"
+
+# One difference between two observations of the same search
+FareChange = namedtuple('FareChange', ['kind', 'flight', 'brand', 'old_price', 'new_price'])
+# Outcome of ChangeTracker.observe
+Observation = namedtuple('Observation', ['key', 'fingerprint', 'unchanged', 'first_seen', 'changes'])
+
+
+def fare_state(fare_cells):
+    """
+    Reduce fare cells to what matters for change detection.
+
+    Returns:
+        A dict mapping (flight, brand) to price, with None for sold-out fares.
+        Seat counts and fare keys are ignored so "3 seats left" -> "2 seats left" is not a change.
+    """
+    state = {}
+    for cell in fare_cells or []:
+        price = cell.get('priceSpecification', {}).get('totalPrice')
+        if cell.get('isSoldOut'):
+            price = None
+        state[(cell.get('flightNumber', ''), cell.get('brandedFareClass', 'N/A'))] = price
+    return state
+
+
+def fingerprint(fare_cells):
+    """Stable hash of the fare state; equal fingerprints mean nothing changed."""
+    canonical = sorted((flight, brand, -1.0 if price is None else round(price, 2))
+                       for (flight, brand), price in fare_state(fare_cells).items())
+    return hashlib.sha1(json.dumps(canonical, separators=(',', ':')).encode()).hexdigest()
+
+
+def diff_fares(old_state, new_state):
+    """
+    Minimal list of FareChange between two fare_state() dicts.
+
+    A new GoWild seat is reported as CHANGE_NEW_GOWILD rather than CHANGE_AVAILABLE.
+    """
+    changes = []
+    old_flights = {flight for flight, _ in old_state}
+    new_flights = {flight for flight, _ in new_state}
+    for flight in sorted(new_flights - old_flights):
+        changes.append(FareChange(CHANGE_FLIGHT_ADDED, flight, None, None, None))
+    for flight in sorted(old_flights - new_flights):
+        changes.append(FareChange(CHANGE_FLIGHT_REMOVED, flight, None, None, None))
+
+    for (flight, brand), new_price in sorted(new_state.items(), key=lambda item: item[0]):
+        old_price = old_state.get((flight, brand))
+        if flight not in old_flights:
+            if brand == 'GoWild' and new_price is not None:
+                changes.append(FareChange(CHANGE_NEW_GOWILD, flight, brand, None, new_price))
+            continue
+        if old_price == new_price:
+            continue
+        if new_price is None:
+            kind = CHANGE_SOLD_OUT
+        elif old_price is None:
+            kind = CHANGE_NEW_GOWILD if brand == 'GoWild' else CHANGE_AVAILABLE
+        else:
+            kind = CHANGE_PRICE
+        changes.append(FareChange(kind, flight, brand, old_price, new_price))
+
+    for (flight, brand), old_price in sorted(old_state.items(), key=lambda item: item[0]):
+        if flight in new_flights and (flight, brand) not in new_state and old_price is not None:
+            changes.append(FareChange(CHANGE_SOLD_OUT, flight, brand, old_price, None))
+    return changes
+
+
+class ChangeTracker:
+    """
+    Remembers the last fare state per search and reports only what changed.
+
+    Each search key (route, date, fare type) keeps its latest fingerprint and
+    compact fare state in SQLite. A search with the same fingerprint only bumps
+    a counter; otherwise the minimal diff is returned and logged.
+    """
+
+    def __init__(self, path="fare_changes.sqlite3"):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway tracker).
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                state TEXT NOT NULL,
+                changed_at REAL NOT NULL,
+                checked_at REAL NOT NULL,
+                unchanged_checks INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS changes (
+                key TEXT NOT NULL,
+                observed_at REAL NOT NULL,
+                kind TEXT NOT NULL,
+                flight TEXT,
+                brand TEXT,
+                old_price REAL,
+                new_price REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS changes_key ON changes (key, observed_at)")
+        self._conn.commit()
+
+    def observe(self, origin, destination, date_str, fare_cells, fare_type='DD'):
+        """
+        Compare a search result with the previous one for the same search.
+
+        Args:
+            fare_cells (list): Fare dictionaries from search_frontier_flights.
+
+        Returns:
+            An Observation. ``unchanged`` is True when the fingerprint matches the
+            last one; ``first_seen`` is True (and ``changes`` empty) for a new key.
+        """
+        key = cache_key(origin, destination, date_str, fare_type)
+        state = fare_state(fare_cells)
+        digest = fingerprint(fare_cells)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, state FROM snapshots WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] == digest:
+                self._conn.execute(
+                    "UPDATE snapshots SET checked_at = ?, unchanged_checks = unchanged_checks + 1 WHERE key = ?",
+                    (now, key))
+                self._conn.commit()
+                return Observation(key, digest, True, False, [])
+
+            changes = []
+            if row is not None:
+                old_state = {(flight, brand): price for flight, brand, price in json.loads(row[1])}
+                changes = diff_fares(old_state, state)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (key, fingerprint, state, changed_at, checked_at, unchanged_checks) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, digest, json.dumps([[f, b, p] for (f, b), p in state.items()], separators=(',', ':')),
+                 now, now))
+            self._conn.executemany(
+                "INSERT INTO changes (key, observed_at, kind, flight, brand, old_price, new_price) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key, now, *change) for change in changes])
+            self._conn.commit()
+        return Observation(key, digest, False, row is None, changes)
+
+    def recent_changes(self, origin, destination, date_str, fare_type='DD', since=0):
+        """Logged FareChange rows for one search, oldest first, with their observation time."""
+        key = cache_key(origin, destination, date_str, fare_type)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT observed_at, kind, flight, brand, old_price, new_price FROM changes "
+                "WHERE key = ? AND observed_at >= ? ORDER BY observed_at", (key, since)).fetchall()
+        return [(observed_at, FareChange(*fields)) for observed_at, *fields in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def changed_cells(fare_cells, changes):
+    """The fare cells touched by ``changes`` (all of a flight's cells for added flights)."""
+    touched = {(c.flight, c.brand) for c in changes}
+    added = {c.flight for c in changes if c.kind == CHANGE_FLIGHT_ADDED}
+    return [cell for cell in fare_cells or []
+            if cell.get('flightNumber', '') in added
+            or (cell.get('flightNumber', ''), cell.get('brandedFareClass', 'N/A')) in touched]
+
+
+def describe_change(change):
+    if change.kind == CHANGE_PRICE:
+        return f"{change.flight} {change.brand}: ${change.old_price:.2f} → ${change.new_price:.2f}"
+    if change.kind == CHANGE_SOLD_OUT:
+        return f"{change.flight} {change.brand}: sold out"
+    if change.kind in (CHANGE_AVAILABLE, CHANGE_NEW_GOWILD):
+        return f"{change.flight} {change.brand}: now ${change.new_price:.2f}"
+    if change.kind == CHANGE_FLIGHT_ADDED:
+        return f"{change.flight}: new flight"
+    return f"{change.flight}: no longer listed"
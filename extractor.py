@@ -0,0 +1,370 @@
+import html
+import json
+import re
+
+# Current Select pages: FlightData = '{&quot;journeys&quot;:[...]}';
+FLIGHT_DATA_MARKER = "FlightData"
+FLIGHT_DATA_PATTERN = r"FlightData\s*=\s*'"
+# Older Select pages: var model = {...};
+MODEL_PATTERN = r"var\s+model\s*=\s*"
+
+LAYOUT_FLIGHT_DATA = "FlightData"
+LAYOUT_MODEL = "model"
+
+# (price field, fare key field, seats field, brand name) for each fare column of a flight
+FLIGHT_FARE_COLUMNS = [
+    ('discountDenFare', 'discountDenFareKey', 'discountDenFareSeatsRemaining', 'DiscountDen'),
+    ('standardFare', 'standardFareKey', 'standardFareSeatsRemaining', 'Standard'),
+    ('goWildFare', 'goWildFareKey', 'goWildFareSeatsRemaining', 'GoWild'),
+    ('economyFare', 'economyFareKey', None, 'Economy'),
+    ('premiumFare', 'premiumFareKey', None, 'Premium'),
+    ('businessFare', 'businessFareKey', None, 'Business'),
+]
+
+_FLIGHT_DATA_RE = {str: re.compile(FLIGHT_DATA_PATTERN), bytes: re.compile(FLIGHT_DATA_PATTERN.encode())}
+_MODEL_RE = {str: re.compile(MODEL_PATTERN), bytes: re.compile(MODEL_PATTERN.encode())}
+_decoder = json.JSONDecoder()
+
+
+def _lit(page, text):
+    """Return ``text`` in the same type (str/bytes) as ``page``."""
+    return text.encode() if isinstance(page, bytes) else text
+
+
+def _to_text(chunk):
+    return chunk.decode('utf-8', errors='replace') if isinstance(chunk, bytes) else chunk
+
+
+def find_flight_data_payload(page):
+    """
+    Locate the HTML-escaped FlightData JSON string without parsing the page.
+
+    Args:
+        page (str | bytes): The Flight/Select HTML.
+
+    Returns:
+        The JSON text (unescaped) or None if the page has no FlightData assignment.
+    """
+    # find() jumps between mentions of the name; the regex only checks the few
+    # bytes after each one, so any spacing around '=' is accepted at find() speed
+    marker, pattern = _lit(page, FLIGHT_DATA_MARKER), _FLIGHT_DATA_RE[type(page)]
+    position = page.find(marker)
+    while position != -1:
+        match = pattern.match(page, position)
+        if match:
+            break
+        position = page.find(marker, position + len(marker))
+    else:
+        return None
+    start = match.end()
+
+    # The payload is a single-quoted JS string; skip any \' inside it
+    quote, backslash = _lit(page, "'"), _lit(page, "\\")
+    end = page.find(quote, start)
+    while end != -1 and page[end - 1:end] == backslash:
+        end = page.find(quote, end + 1)
+    if end == -1:
+        return None
+
+    payload = _to_text(page[start:end])
+    if "&" in payload:
+        payload = html.unescape(payload)
+    return payload.replace("\\'", "'")
+
+
+def find_model_payload(page):
+    """
+    Locate the ``var model = {...};`` object literal.
+
+    Args:
+        page (str | bytes): The Flight/Select HTML.
+
+    Returns:
+        The parsed model dict, or None if the page has no model assignment.
+    """
+    match = _MODEL_RE[type(page)].search(page)
+    if not match:
+        return None
+    end = page.find(_lit(page, "</script>"), match.end())
+    chunk = _to_text(page[match.end():end if end != -1 else len(page)])
+    try:
+        model, _ = _decoder.raw_decode(chunk)
+    except ValueError:
+        return None
+    return model if isinstance(model, dict) else None
+
+
+def extract_flight_data(page):
+    """
+    Pull the embedded flight JSON out of a Flight/Select page in one pass.
+
+    Args:
+        page (str | bytes): The Flight/Select HTML.
+
+    Returns:
+        A (layout, data) tuple where layout is LAYOUT_FLIGHT_DATA or LAYOUT_MODEL,
+        or None if neither payload is present or it does not parse.
+    """
+    payload = find_flight_data_payload(page)
+    if payload is not None:
+        try:
+            return LAYOUT_FLIGHT_DATA, json.loads(payload)
+        except ValueError:
+            pass
+
+    model = find_model_payload(page)
+    if model is not None:
+        return LAYOUT_MODEL, model
+    return None
+
+
+def fare_class_from_key(fare_key):
+    """'0~M~~F9~M14PXDN~CLUB~~0~5~~X|F9~4817~...' -> 'M'."""
+    parts = (fare_key or '').split('~')
+    return parts[1] if len(parts) > 1 and parts[1] else 'N/A'
+
+
+def flight_to_fare_cells(flight, journey):
+    """
+    Expand one FlightData flight into fare-cell dicts, one per fare column.
+
+    The cells keep the keys of the older ``fareTensor.cells`` shape
+    (brandedFareClass, fareClassInput, priceSpecification.totalPrice, isSoldOut)
+    so callers work the same on either page layout.
+    """
+    legs = flight.get('legs') or []
+    first_leg = legs[0] if legs else {}
+    last_leg = legs[-1] if legs else {}
+    flight_number = "/".join(f"{leg.get('carrierCode', '')}{leg.get('flightNumber', '')}" for leg in legs)
+
+    cells = []
+    for price_field, key_field, seats_field, brand in FLIGHT_FARE_COLUMNS:
+        price = flight.get(price_field)
+        fare_key = flight.get(key_field) or ''
+        if price is None or (price <= 0 and not fare_key):
+            # Column not offered on this flight (e.g. goWildFare == -1.0)
+            if brand != 'GoWild':
+                continue
+        is_sold_out = price is None or price <= 0
+        cells.append({
+            'brandedFareClass': brand,
+            'fareClassInput': fare_class_from_key(fare_key),
+            'priceSpecification': {'totalPrice': None if is_sold_out else price},
+            'isSoldOut': is_sold_out,
+            'seatsRemaining': flight.get(seats_field) if seats_field else None,
+            'fareKey': fare_key,
+            'flightNumber': flight_number,
+            'departureStation': first_leg.get('departureStation', journey.get('departureStation')),
+            'arrivalStation': last_leg.get('arrivalStation', journey.get('arrivalStation')),
+            'departureDate': first_leg.get('departureDate'),
+            'arrivalDate': last_leg.get('arrivalDate'),
+            'stopCount': flight.get('stopCount', 0),
+            'isGoWildFareEnabled': flight.get('isGoWildFareEnabled', False),
+            'isReturnTrip': journey.get('isReturnTrip', False),
+        })
+    return cells
+
+
+def journey_fare_cells(journey):
+    """Fare cells for every flight of one FlightData journey."""
+    cells = []
+    for flight in journey.get('flights') or []:
+        cells.extend(flight_to_fare_cells(flight, journey))
+    return cells
+
+
+def fare_cells_from_flight_data(layout, data):
+    """
+    Turn an extracted payload into the list of fare cells returned by searches.
+
+    Args:
+        layout (str): LAYOUT_FLIGHT_DATA or LAYOUT_MODEL, as returned by extract_flight_data.
+        data (dict): The parsed payload.
+
+    Returns:
+        A (fare_cells, message) tuple. fare_cells is None when the site reported
+        no flights, in which case message explains why.
+    """
+    if layout == LAYOUT_MODEL:
+        journey = data.get('journey', {})
+        if not journey.get('isSuccess', False):
+            return None, journey.get('message', 'No flights found on this date.')
+        return journey.get('fareTensor', {}).get('cells', []), None
+
+    cells = []
+    for journey in data.get('journeys') or []:
+        cells.extend(journey_fare_cells(journey))
+    if not cells:
+        return None, 'No flights found on this date.'
+    return cells, None
+
+
+def split_journeys(fare_cells):
+    """
+    Split the cells of a round-trip search into its two legs.
+
+    Returns:
+        An (outbound_cells, return_cells) tuple; return_cells is empty for one-way searches.
+    """
+    outbound, inbound = [], []
+    for cell in fare_cells or []:
+        (inbound if cell.get('isReturnTrip') else outbound).append(cell)
+    return outbound, inbound
+
+
+def ribbon_low_fares(layout, data):
+    """
+    Per-date lowest fares from the outbound journey's date ribbon.
+
+    The Select page already carries the lowest fare for the days around the
+    searched date, plus the query string that selects each of them.
+
+    Returns:
+        A list of (date_str, fare, key) tuples; fare is None for disabled or
+        unpriced days. Empty for the legacy ``model`` layout, which has no ribbon.
+    """
+    if layout != LAYOUT_FLIGHT_DATA:
+        return []
+    for journey in data.get('journeys') or []:
+        if journey.get('isReturnTrip'):
+            continue
+        ribbon = journey.get('ribbon') or {}
+        days = []
+        for day in ribbon.get('displayDates') or []:
+            date_str = day.get('dateKey') or (day.get('date') or '')[:10]
+            if not date_str:
+                continue
+            fare = day.get('fare')
+            if day.get('isDisabled') or fare is None or fare <= 0:
+                fare = None
+            days.append((date_str, fare, day.get('key')))
+        return days
+    return []
+
+
+def extract_fare_cells(page):
+    """
+    Convenience wrapper: page HTML in, fare cells out.
+
+    Returns:
+        A list of fare dicts, or None if the page has no usable flight data.
+    """
+    extracted = extract_flight_data(page)
+    if extracted is None:
+        return None
+    cells, _ = fare_cells_from_flight_data(*extracted)
+    return cells
+
+
+# Runs inside the page: reads the FlightData / model globals and returns only the
+# fields flight_to_fare_cells needs, as one JSON string (~tens of KB instead of ~1.8 MB).
+IN_BROWSER_EXTRACT_JS = """
+var compact = arguments[0];
+var fareFields = arguments[1];
+var raw = window.FlightData;
+if (typeof raw === 'string' && raw.length) {
+    var text = raw.replace(/&quot;/g, '"').replace(/&#39;/g, "'").replace(/&lt;/g, '<')
+                  .replace(/&gt;/g, '>').replace(/&amp;/g, '&');
+    if (!compact) { return JSON.stringify({layout: 'FlightData', data: JSON.parse(text)}); }
+    var data = JSON.parse(text);
+    var journeys = (data.journeys || []).map(function (j) {
+        return {
+            isReturnTrip: j.isReturnTrip, departureStation: j.departureStation,
+            arrivalStation: j.arrivalStation, ribbon: j.ribbon,
+            flights: (j.flights || []).map(function (f) {
+                var out = {stopCount: f.stopCount, isGoWildFareEnabled: f.isGoWildFareEnabled,
+                           legs: (f.legs || []).map(function (l) {
+                               return {departureStation: l.departureStation, arrivalStation: l.arrivalStation,
+                                       departureDate: l.departureDate, arrivalDate: l.arrivalDate,
+                                       carrierCode: l.carrierCode, flightNumber: l.flightNumber};
+                           })};
+                fareFields.forEach(function (k) { if (k in f) { out[k] = f[k]; } });
+                return out;
+            })
+        };
+    });
+    return JSON.stringify({layout: 'FlightData', data: {journeys: journeys, isRoundTrip: data.isRoundTrip}});
+}
+if (typeof window.model === 'object' && window.model !== null) {
+    var journey = window.model.journey || {};
+    var model = compact ? {journey: {isSuccess: journey.isSuccess, message: journey.message,
+                                     fareTensor: {cells: (journey.fareTensor || {}).cells || []}}}
+                        : window.model;
+    return JSON.stringify({layout: 'model', data: model});
+}
+return null;
+"""
+
+
+def in_browser_fare_fields():
+    """Flight fields the compact in-browser projection keeps."""
+    fields = []
+    for price_field, key_field, seats_field, _ in FLIGHT_FARE_COLUMNS:
+        fields.extend(f for f in (price_field, key_field, seats_field) if f)
+    return fields
+
+
+def extract_flight_data_in_browser(driver, compact=True):
+    """
+    Read the flight payload from the page's JS globals with one execute_script call.
+
+    Only the projected JSON crosses the WebDriver wire; ``driver.page_source`` is never read.
+
+    Args:
+        driver: A webdriver on the Flight/Select page.
+        compact (bool): Return only the fields needed for fare cells instead of the full payload.
+
+    Returns:
+        A (layout, data) tuple like extract_flight_data, or None if the globals are missing.
+    """
+    result = driver.execute_script(IN_BROWSER_EXTRACT_JS, compact, in_browser_fare_fields())
+    if not result:
+        return None
+    try:
+        decoded = json.loads(result)
+    except ValueError:
+        return None
+    return decoded['layout'], decoded['data']
+
+
+# Payload kinds handed between pipeline stages
+PAYLOAD_HTML = "html"
+PAYLOAD_FLIGHT_DATA = "flight_data"
+
+
+def fetch_raw_flight_data(driver):
+    """
+    Read the still-escaped FlightData string from the page (~60 KB), leaving all parsing to Python.
+
+    Returns:
+        A (kind, text) payload for extract_payload: the raw FlightData string when the
+        global is present, otherwise the full page source.
+    """
+    raw = driver.execute_script("return typeof window.FlightData === 'string' ? window.FlightData : null;")
+    if raw:
+        return PAYLOAD_FLIGHT_DATA, raw
+    return PAYLOAD_HTML, driver.page_source
+
+
+def extract_payload(kind, text):
+    """
+    Turn an acquired payload into fare cells. Picklable, so it can run in a process pool.
+
+    Args:
+        kind (str): PAYLOAD_FLIGHT_DATA for a raw FlightData string, PAYLOAD_HTML for a page.
+        text (str): The payload.
+
+    Returns:
+        A (fare_cells, message) tuple as from fare_cells_from_flight_data; fare_cells is
+        None when there is no usable flight data.
+    """
+    if kind == PAYLOAD_FLIGHT_DATA:
+        try:
+            extracted = LAYOUT_FLIGHT_DATA, json.loads(html.unescape(text))
+        except ValueError:
+            return None, 'Could not parse the FlightData payload.'
+    else:
+        extracted = extract_flight_data(text)
+        if extracted is None:
+            return None, 'Could not find the flight data in the page.'
+    return fare_cells_from_flight_data(*extracted)
@@ -0,0 +1,238 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+from main import ONE_ADULT, search_frontier_flights_with_retry
+
+# (max days until departure, TTL in seconds): fares move faster as departure nears
+DEFAULT_TTL_TIERS = [
+    (1, 5 * 60),
+    (3, 15 * 60),
+    (7, 30 * 60),
+    (30, 2 * 60 * 60),
+    (None, 6 * 60 * 60),
+]
+
+
+def cache_key(origin, destination, date_str, fare_type='DD', return_date=None, passengers=None):
+    """
+    Key identifying one search: route, departure date and fare type (DD/STD).
+
+    Round trips add the return date and non-default passenger counts add e.g.
+    "2A1C0I", so one-way, one-adult keys keep their original form.
+    """
+    key = f"{origin.upper()}-{destination.upper()}-{date_str}-{fare_type.upper()}"
+    if return_date:
+        key += f"-R{return_date}"
+    if passengers and tuple(passengers) != tuple(ONE_ADULT):
+        adults, children, infants = passengers
+        key += f"-{adults}A{children}C{infants}I"
+    return key
+
+
+def ttl_for_date(date_str, ttl_tiers=DEFAULT_TTL_TIERS, today=None):
+    """
+    Pick the TTL (seconds) for a departure date from the tier table.
+
+    Args:
+        date_str (str): The departure date in 'YYYY-MM-DD' format.
+        ttl_tiers (list): (max_days_out, ttl_seconds) pairs, ascending; None matches anything.
+        today (date): Reference day (default: today).
+    """
+    today = today or date.today()
+    days_out = (datetime.strptime(date_str, '%Y-%m-%d').date() - today).days
+    for max_days, ttl in ttl_tiers:
+        if max_days is None or days_out <= max_days:
+            return ttl
+    return ttl_tiers[-1][1]
+
+
+class FareCache:
+    """
+    SQLite-backed fare cache with date-aware TTLs, LRU eviction and stale-while-revalidate.
+
+    Entries are keyed by (origin, destination, date, fare type), plus the return
+    date and passengers for round-trip / multi-passenger searches. Expired entries
+    younger than ``max_stale`` are still served immediately while a background
+    thread refreshes them; older ones are fetched synchronously.
+    """
+
+    def __init__(self, path="fare_cache.sqlite3", max_bytes=50 * 1024 * 1024,
+                 max_stale=6 * 60 * 60, ttl_tiers=DEFAULT_TTL_TIERS):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway cache).
+            max_bytes (int): Total payload size kept before least-recently-used entries are evicted.
+            max_stale (float): Seconds past expiry an entry may still be served while refreshing.
+            ttl_tiers (list): (max_days_out, ttl_seconds) pairs, see ttl_for_date.
+        """
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.ttl_tiers = ttl_tiers
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fares (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fares_last_access ON fares (last_access)")
+        self._conn.commit()
+
+    def get(self, origin, destination, date_str, fare_type='DD', return_date=None, passengers=None):
+        """
+        Look up a cached result.
+
+        Returns:
+            A (fares, is_fresh) tuple, or (None, False) on a miss.
+        """
+        key = cache_key(origin, destination, date_str, fare_type, return_date, passengers)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM fares WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None, False
+            self._conn.execute("UPDATE fares SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        payload, expires_at = row
+        return json.loads(payload), now < expires_at
+
+    def _age_past_expiry(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM fares WHERE key = ?", (key,)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def put(self, origin, destination, date_str, fares, fare_type='DD', ttl=None, return_date=None,
+            passengers=None):
+        """
+        Store a result and evict least-recently-used entries beyond ``max_bytes``.
+
+        Args:
+            fares (list): The fare cells to cache.
+            ttl (float): Override the date-based TTL in seconds.
+            return_date (str): Return date of a round-trip search.
+            passengers (Passengers): Travellers the search priced for.
+        """
+        key = cache_key(origin, destination, date_str, fare_type, return_date, passengers)
+        if ttl is None:
+            ttl = ttl_for_date(date_str, self.ttl_tiers)
+        payload = json.dumps(fares, separators=(',', ':'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fares (key, payload, size, fetched_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now + ttl, now))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM fares").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM fares ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM fares WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        print(f"🧹 Evicted {evicted} cached searches to stay under {self.max_bytes} bytes")
+
+    def invalidate(self, origin, destination, date_str, fare_type='DD', return_date=None, passengers=None):
+        with self._lock:
+            self._conn.execute("DELETE FROM fares WHERE key = ?",
+                               (cache_key(origin, destination, date_str, fare_type, return_date, passengers),))
+            self._conn.commit()
+
+    def get_or_fetch(self, origin, destination, date_str, fetch, fare_type='DD', return_date=None,
+                     passengers=None):
+        """
+        Serve from cache, refreshing in the background when the entry is stale.
+
+        Args:
+            fetch (callable): Called as ``fetch(origin, destination, date_str, fare_type)`` on a
+                              miss or refresh; returns fares or None.
+            return_date (str): Return date of a round-trip search (part of the key).
+            passengers (Passengers): Travellers the search prices for (part of the key).
+
+        Returns:
+            A list of fare dictionaries, or None if there was nothing cached and the fetch failed.
+        """
+        options = {'return_date': return_date, 'passengers': passengers}
+        key = cache_key(origin, destination, date_str, fare_type, **options)
+        fares, is_fresh = self.get(origin, destination, date_str, fare_type, **options)
+        if fares is not None and is_fresh:
+            print(f"📦 Cache hit for {key}")
+            return fares
+
+        if fares is not None:
+            age = self._age_past_expiry(key)
+            if age is not None and age <= self.max_stale:
+                print(f"📦 Serving stale {key} while refreshing in the background")
+                self._refresh_in_background(key, origin, destination, date_str, fetch, fare_type, options)
+                return fares
+
+        print(f"📭 Cache miss for {key}")
+        fresh = fetch(origin, destination, date_str, fare_type)
+        if fresh is not None:
+            self.put(origin, destination, date_str, fresh, fare_type, **options)
+            return fresh
+        return fares
+
+    def _refresh_in_background(self, key, origin, destination, date_str, fetch, fare_type, options):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                fresh = fetch(origin, destination, date_str, fare_type)
+                if fresh is not None:
+                    self.put(origin, destination, date_str, fresh, fare_type, **options)
+            except Exception as e:
+                print(f"⚠️  Background refresh of {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"refresh-{key}", daemon=True).start()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cached_search(origin, destination, date_str, cache, use_proxy=True, fare_type='DD', return_date=None,
+                  passengers=None, **kwargs):
+    """
+    search_frontier_flights_with_retry behind a FareCache.
+
+    Args:
+        cache (FareCache): The cache to consult and fill.
+        return_date (str): Return date for a round trip; cached separately from one-way searches.
+        passengers (Passengers): Travellers to price for; each party size is cached separately.
+        **kwargs: Passed through to search_frontier_flights_with_retry (e.g. pool, max_retries).
+
+    Returns:
+        A list of fare dictionaries, or None if nothing is cached and all attempts fail.
+    """
+    def fetch(origin, destination, date_str, fare_type):
+        return search_frontier_flights_with_retry(origin, destination, date_str, use_proxy=use_proxy,
+                                                  fare_type=fare_type, return_date=return_date,
+                                                  passengers=passengers, **kwargs)
+
+    return cache.get_or_fetch(origin, destination, date_str, fetch, fare_type=fare_type,
+                              return_date=return_date, passengers=passengers)
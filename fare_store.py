@@ -0,0 +1,340 @@
+import json
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+# numpy is imported on first scan, not at import time (see _numpy)
+_np = False
+
+# Bits of the `flags` column
+FLAG_SOLD_OUT = 1
+FLAG_GOWILD = 2
+
+# column name -> (array typecode, numpy dtype)
+COLUMNS = {
+    'route': ('H', '<u2'),
+    'day': ('i', '<i4'),
+    'flight': ('I', '<u4'),
+    'brand': ('B', 'u1'),
+    'fare_class': ('B', 'u1'),
+    'price': ('f', '<f4'),
+    'flags': ('B', 'u1'),
+    'scraped_at': ('d', '<f8'),
+}
+# Columns whose values are codes into a string dictionary
+DICTIONARY_COLUMNS = ('route', 'flight', 'brand', 'fare_class')
+
+
+def _numpy():
+    """numpy, imported on first use, or None if it is not installed (pure-Python scans still work)."""
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+    return _np
+
+
+class FareRecord:
+    """One observed fare, normalized from a fare cell."""
+
+    __slots__ = ('origin', 'destination', 'date', 'flight', 'brand', 'fare_class',
+                 'price', 'sold_out', 'gowild', 'scraped_at')
+
+    def __init__(self, origin, destination, date, flight, brand, fare_class,
+                 price, sold_out, gowild, scraped_at):
+        self.origin = origin
+        self.destination = destination
+        self.date = date
+        self.flight = flight
+        self.brand = brand
+        self.fare_class = fare_class
+        self.price = price
+        self.sold_out = sold_out
+        self.gowild = gowild
+        self.scraped_at = scraped_at
+
+    @property
+    def route(self):
+        return f"{self.origin}-{self.destination}"
+
+    def __repr__(self):
+        price = "SOLD OUT" if self.sold_out else f"${self.price:.2f}"
+        return (f"FareRecord({self.route} {self.date} {self.flight} {self.brand}"
+                f"/{self.fare_class} {price}{' GoWild' if self.gowild else ''})")
+
+
+def fare_records_from_cells(origin, destination, date_str, fare_cells, scraped_at=None):
+    """
+    Normalize fare cells returned by a search into FareRecords.
+
+    Args:
+        origin (str): The origin IATA code searched.
+        destination (str): The destination IATA code searched.
+        date_str (str): The departure date searched ('YYYY-MM-DD'), used for cells without a departureDate.
+        fare_cells (list): Fare dictionaries from search_frontier_flights.
+        scraped_at (float): Unix time of the scrape (default: now).
+
+    Returns:
+        A list of FareRecord.
+    """
+    scraped_at = scraped_at or time.time()
+    records = []
+    for cell in fare_cells or []:
+        price = cell.get('priceSpecification', {}).get('totalPrice')
+        sold_out = bool(cell.get('isSoldOut', False)) or price is None
+        brand = cell.get('brandedFareClass', 'N/A')
+        records.append(FareRecord(
+            origin=cell.get('departureStation') or origin,
+            destination=cell.get('arrivalStation') or destination,
+            # Return-leg cells of a round-trip search depart on the return date
+            date=(cell.get('departureDate') or '')[:10] or date_str,
+            flight=cell.get('flightNumber', ''),
+            brand=brand,
+            fare_class=cell.get('fareClassInput', 'N/A'),
+            price=float('nan') if price is None else float(price),
+            sold_out=sold_out,
+            gowild=brand == 'GoWild' and not sold_out,
+            scraped_at=scraped_at,
+        ))
+    return records
+
+
+class FareHistory:
+    """
+    Append-only columnar history of FareRecords.
+
+    Each column is a flat little-endian binary file (directly loadable with
+    ``numpy.fromfile``) and strings are dictionary-encoded, so an observation
+    costs 25 bytes on disk and scans never touch JSON. When NumPy is available
+    queries are vectorized; otherwise they fall back to plain loops.
+
+    Appends hold a thread lock plus (where fcntl exists) an exclusive flock on
+    ``.lock`` in the directory, and first pick up the dictionary entries and
+    rows other processes wrote, so worker processes, the watchlist daemon and
+    the CLI can all append to the same directory. Without fcntl (Windows) appends
+    are only serialized within one process, so give each process its own directory.
+
+    An append is not atomic: a crash can leave some column files a few rows
+    longer than others. Readers only count whole rows, and the next append or
+    refresh truncates the torn tail before writing, so the columns stay aligned
+    (the interrupted records are lost).
+    """
+
+    def __init__(self, directory="fare_history"):
+        """
+        Args:
+            directory (str): Folder holding the column files and string dictionaries.
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._dict_path = os.path.join(directory, "dictionaries.json")
+        self._lock_path = os.path.join(directory, ".lock")
+        self._dict_stat = None
+        self._values = {name: [] for name in DICTIONARY_COLUMNS}
+        self._codes = {name: {} for name in DICTIONARY_COLUMNS}
+        self.columns = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+        self.refresh()
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access to the directory, against other threads and other processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Load dictionary entries and rows appended (e.g. by other processes) since the last look."""
+        with self._locked():
+            self._sync()
+
+    def _sync(self):
+        # Caller holds _locked(). Dictionaries only ever grow, so a changed file is reloaded whole.
+        if os.path.exists(self._dict_path):
+            stat = os.stat(self._dict_path)
+            if (stat.st_mtime_ns, stat.st_size) != self._dict_stat:
+                with open(self._dict_path, encoding='utf-8') as f:
+                    stored = json.load(f)
+                for name in DICTIONARY_COLUMNS:
+                    self._values[name] = stored.get(name, [])
+                    self._codes[name] = {value: code for code, value in enumerate(self._values[name])}
+                self._dict_stat = (stat.st_mtime_ns, stat.st_size)
+
+        # An interrupted append can leave some columns longer than others (or a partial
+        # value at the end); only whole rows count, and the torn tail is cut off so the
+        # next append lines up again. Its dictionary entries just go unused.
+        sizes = {name: os.path.getsize(self._column_path(name))
+                 if os.path.exists(self._column_path(name)) else 0
+                 for name in self.columns}
+        rows = min(sizes[name] // column.itemsize for name, column in self.columns.items())
+        for name, column in self.columns.items():
+            if sizes[name] > rows * column.itemsize:
+                os.truncate(self._column_path(name), rows * column.itemsize)
+            if len(column) > rows:
+                del column[rows:]
+            elif rows > len(column):
+                with open(self._column_path(name), 'rb') as f:
+                    f.seek(len(column) * column.itemsize)
+                    column.frombytes(f.read((rows - len(column)) * column.itemsize))
+
+    def __len__(self):
+        return len(self.columns['price'])
+
+    def _column_path(self, name):
+        return os.path.join(self.directory, f"{name}.col")
+
+    def _encode(self, name, value):
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._values[name])
+            self._values[name].append(value)
+        return code
+
+    def append(self, records):
+        """
+        Append records to memory and to the column files.
+
+        Args:
+            records (list): FareRecord instances.
+
+        Returns:
+            The number of records written.
+        """
+        # Dictionary codes and the column files must advance together
+        with self._locked():
+            self._sync()
+            return self._append(records)
+
+    def _append(self, records):
+        new = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+        dictionary_size = sum(len(v) for v in self._values.values())
+        day_ordinals = {}
+        for record in records:
+            day = day_ordinals.get(record.date)
+            if day is None:
+                day = day_ordinals[record.date] = datetime.strptime(record.date, '%Y-%m-%d').toordinal()
+            new['route'].append(self._encode('route', record.route))
+            new['day'].append(day)
+            new['flight'].append(self._encode('flight', record.flight))
+            new['brand'].append(self._encode('brand', record.brand))
+            new['fare_class'].append(self._encode('fare_class', record.fare_class))
+            new['price'].append(record.price)
+            new['flags'].append((FLAG_SOLD_OUT if record.sold_out else 0) |
+                                (FLAG_GOWILD if record.gowild else 0))
+            new['scraped_at'].append(record.scraped_at)
+
+        if not new['price']:
+            return 0
+        # Dictionaries first, so column codes on disk always resolve
+        if sum(len(v) for v in self._values.values()) != dictionary_size:
+            tmp_path = self._dict_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._values, f)
+            os.replace(tmp_path, self._dict_path)
+            stat = os.stat(self._dict_path)
+            self._dict_stat = (stat.st_mtime_ns, stat.st_size)
+        for name, column in new.items():
+            with open(self._column_path(name), 'ab') as f:
+                column.tofile(f)
+            self.columns[name].extend(column)
+        return len(new['price'])
+
+    def _numpy_columns(self):
+        np = _numpy()
+        return {name: np.frombuffer(self.columns[name], dtype=dtype) if len(self) else np.empty(0, dtype)
+                for name, (_, dtype) in COLUMNS.items()}
+
+    def cheapest_gowild_by_route(self, days=30, now=None):
+        """
+        Cheapest available GoWild fare per route among observations from the last ``days`` days.
+
+        Returns:
+            A dict mapping 'ORG-DST' to a FareRecord of the cheapest observation.
+        """
+        now = now or time.time()
+        cutoff = now - days * 86400
+        gowild_brand = self._codes['brand'].get('GoWild')
+        if gowild_brand is None or not len(self):
+            return {}
+
+        np = _numpy()
+        if np is not None:
+            cols = self._numpy_columns()
+            mask = ((cols['flags'] & FLAG_GOWILD) != 0) & (cols['scraped_at'] >= cutoff)
+            rows = np.nonzero(mask)[0]
+            if not rows.size:
+                return {}
+            order = rows[np.lexsort((cols['price'][rows], cols['route'][rows]))]
+            routes = cols['route'][order]
+            first = np.ones(order.size, dtype=bool)
+            first[1:] = routes[1:] != routes[:-1]
+            best_rows = order[first].tolist()
+        else:
+            best = {}
+            route, price, flags, scraped = (self.columns[n] for n in ('route', 'price', 'flags', 'scraped_at'))
+            for i in range(len(price)):
+                if flags[i] & FLAG_GOWILD and scraped[i] >= cutoff:
+                    current = best.get(route[i])
+                    if current is None or price[i] < price[current]:
+                        best[route[i]] = i
+            best_rows = list(best.values())
+
+        result = {}
+        for i in best_rows:
+            record = self.record_at(i)
+            result[record.route] = record
+        return result
+
+    def record_at(self, i):
+        """Rebuild the FareRecord stored at row ``i``."""
+        cols = self.columns
+        origin, destination = self._values['route'][cols['route'][i]].split('-', 1)
+        flags = cols['flags'][i]
+        return FareRecord(
+            origin=origin,
+            destination=destination,
+            date=date.fromordinal(cols['day'][i]).isoformat(),
+            flight=self._values['flight'][cols['flight'][i]],
+            brand=self._values['brand'][cols['brand'][i]],
+            fare_class=self._values['fare_class'][cols['fare_class'][i]],
+            price=cols['price'][i],
+            sold_out=bool(flags & FLAG_SOLD_OUT),
+            gowild=bool(flags & FLAG_GOWILD),
+            scraped_at=cols['scraped_at'][i],
+        )
+
+    def records(self, route=None, since=None):
+        """
+        Iterate over stored records, optionally for one 'ORG-DST' route and/or since a Unix time.
+        """
+        route_code = None
+        if route is not None:
+            route_code = self._codes['route'].get(route)
+            if route_code is None:
+                return
+        route_col, scraped_col = self.columns['route'], self.columns['scraped_at']
+        for i in range(len(self)):
+            if route_code is not None and route_col[i] != route_code:
+                continue
+            if since is not None and scraped_col[i] < since:
+                continue
+            yield self.record_at(i)
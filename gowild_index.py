@@ -0,0 +1,250 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+DEFAULT_SNAPSHOT_PATH = "gowild_index.json.gz"
+SNAPSHOT_VERSION = 1
+
+# Local times are stored as minutes since this epoch; both ends of a connection
+# are in the hub's local time, so differences are real connection times.
+_EPOCH = datetime(2000, 1, 1)
+
+# One bookable GoWild itinerary between two airports (departs/arrives in local minutes)
+GoWildFlight = namedtuple('GoWildFlight', ['flight', 'departs', 'arrives', 'price', 'stops'])
+# origin -> hub -> destination on two GoWild itineraries
+TwoHopItinerary = namedtuple('TwoHopItinerary', ['origin', 'hub', 'destination', 'first', 'second'])
+
+
+def _to_minutes(timestamp):
+    """'2025-07-15T06:20:00' -> minutes since _EPOCH (None if missing)."""
+    if not timestamp:
+        return None
+    return int((datetime.strptime(timestamp[:16], '%Y-%m-%dT%H:%M') - _EPOCH).total_seconds() // 60)
+
+
+def minutes_to_datetime(minutes):
+    return _EPOCH + timedelta(minutes=minutes)
+
+
+def gowild_flights_from_cells(fare_cells):
+    """
+    Group the bookable GoWild cells of a search by (origin, destination, date).
+
+    Returns:
+        A dict mapping (origin, destination, 'YYYY-MM-DD') to a list of GoWildFlight,
+        cheapest first.
+    """
+    grouped = {}
+    for cell in fare_cells or []:
+        if cell.get('brandedFareClass') != 'GoWild' or cell.get('isSoldOut'):
+            continue
+        price = cell.get('priceSpecification', {}).get('totalPrice')
+        departs = _to_minutes(cell.get('departureDate'))
+        if price is None or departs is None:
+            continue
+        key = (cell.get('departureStation'), cell.get('arrivalStation'), cell['departureDate'][:10])
+        grouped.setdefault(key, []).append(GoWildFlight(
+            flight=cell.get('flightNumber', ''),
+            departs=departs,
+            arrives=_to_minutes(cell.get('arrivalDate')) or departs,
+            price=float(price),
+            stops=cell.get('stopCount', 0),
+        ))
+    for flights in grouped.values():
+        flights.sort(key=lambda f: (f.price, f.departs))
+    return grouped
+
+
+class GoWildIndex:
+    """
+    In-memory origin -> date -> destination index of routes with GoWild seats.
+
+    It is filled incrementally from search results (each search replaces what
+    was known for its route and date), so network questions such as "where can
+    I fly from JFK tomorrow" or "which one-stop GoWild trips go via DEN" are
+    answered from dict lookups instead of new searches. ``save()`` writes a
+    compact gzip snapshot that ``load()`` restores in one pass.
+    """
+
+    def __init__(self):
+        self._index = {}      # origin -> date -> destination -> tuple(GoWildFlight)
+        self._searched = {}   # (origin, destination, date) -> scraped_at of the last search
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Number of (origin, destination, date) entries with GoWild seats."""
+        return sum(len(dests) for dates in self._index.values() for dests in dates.values())
+
+    def _set(self, origin, destination, date_str, flights):
+        dates = self._index.setdefault(origin, {})
+        if flights:
+            dates.setdefault(date_str, {})[destination] = tuple(flights)
+            return
+        destinations = dates.get(date_str)
+        if destinations is not None:
+            destinations.pop(destination, None)
+            if not destinations:
+                del dates[date_str]
+        if not dates:
+            del self._index[origin]
+
+    def add_search(self, origin, destination, date_str, fare_cells, scraped_at=None):
+        """
+        Record the outcome of one search.
+
+        Args:
+            origin (str): The origin IATA code searched.
+            destination (str): The destination IATA code searched.
+            date_str (str): The departure date searched ('YYYY-MM-DD').
+            fare_cells (list): Fare dictionaries from search_frontier_flights (None or
+                               empty clears the route for that date).
+            scraped_at (float): Unix time of the search (default: now).
+
+        Returns:
+            The number of GoWild itineraries now indexed for this search.
+        """
+        scraped_at = scraped_at or time.time()
+        grouped = gowild_flights_from_cells(fare_cells)
+        grouped.setdefault((origin, destination, date_str), [])
+        with self._lock:
+            for (o, d, day), flights in grouped.items():
+                self._set(o, d, day, flights)
+                self._searched[(o, d, day)] = scraped_at
+        return sum(len(flights) for flights in grouped.values())
+
+    def destinations(self, origin, date_str):
+        """
+        Destinations reachable from ``origin`` on ``date_str`` with a GoWild seat.
+
+        Returns:
+            A dict mapping destination to its cheapest GoWildFlight.
+        """
+        destinations = self._index.get(origin, {}).get(date_str, {})
+        return {destination: flights[0] for destination, flights in destinations.items()}
+
+    def flights(self, origin, destination, date_str):
+        """All indexed GoWild itineraries for one route and date, cheapest first."""
+        return list(self._index.get(origin, {}).get(date_str, {}).get(destination, ()))
+
+    def searched_at(self, origin, destination, date_str):
+        """Unix time the route/date was last searched, or None if it never was."""
+        return self._searched.get((origin, destination, date_str))
+
+    def two_hop(self, origin, date_str, hub=None, destination=None, min_connection=60, max_connection=720):
+        """
+        One-stop GoWild trips built from two indexed itineraries.
+
+        Args:
+            origin (str): Departure airport.
+            date_str (str): Departure date of the first itinerary ('YYYY-MM-DD').
+            hub (str): Only connect through this airport (default: any indexed destination).
+            destination (str): Only return trips ending here (default: anywhere but ``origin``).
+            min_connection (int): Minimum minutes between arriving at and leaving the hub.
+            max_connection (int): Maximum minutes between arriving at and leaving the hub.
+
+        Returns:
+            A list of TwoHopItinerary, cheapest total price first.
+        """
+        first_legs = self._index.get(origin, {}).get(date_str, {})
+        hubs = [hub] if hub is not None else list(first_legs)
+        results = []
+        for hub_code in hubs:
+            for first in first_legs.get(hub_code, ()):
+                earliest = first.arrives + min_connection
+                latest = first.arrives + max_connection
+                # The onward leg may leave the day after the first one lands
+                first_day = minutes_to_datetime(earliest).strftime('%Y-%m-%d')
+                last_day = minutes_to_datetime(latest).strftime('%Y-%m-%d')
+                hub_dates = self._index.get(hub_code, {})
+                for day in {first_day, last_day}:
+                    for onward_destination, onward in hub_dates.get(day, {}).items():
+                        if onward_destination == origin:
+                            continue
+                        if destination is not None and onward_destination != destination:
+                            continue
+                        for second in onward:
+                            if earliest <= second.departs <= latest:
+                                results.append(TwoHopItinerary(origin, hub_code, onward_destination,
+                                                               first, second))
+        results.sort(key=lambda trip: (trip.first.price + trip.second.price, trip.second.arrives))
+        return results
+
+    def save(self, path=DEFAULT_SNAPSHOT_PATH):
+        """
+        Write a compact gzip snapshot (airport codes stored once, one row per itinerary).
+
+        The file is written next to ``path`` and renamed over it, so readers never see half a snapshot.
+        """
+        with self._lock:
+            airports = sorted({o for o, _, _ in self._searched} | {d for _, d, _ in self._searched})
+            code = {airport: i for i, airport in enumerate(airports)}
+            searched = [[code[o], code[d], day, scraped_at]
+                        for (o, d, day), scraped_at in self._searched.items()]
+            rows = [[code[o], code[d], day, *flight]
+                    for o, dates in self._index.items()
+                    for day, destinations in dates.items()
+                    for d, flights in destinations.items()
+                    for flight in flights]
+        snapshot = {'version': SNAPSHOT_VERSION, 'airports': airports, 'searched': searched, 'rows': rows}
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        return len(rows)
+
+    @classmethod
+    def load(cls, path=DEFAULT_SNAPSHOT_PATH):
+        """
+        Restore an index saved with ``save()``.
+
+        Returns:
+            A GoWildIndex (empty if ``path`` does not exist).
+
+        Raises:
+            ValueError: If the snapshot was written by an incompatible version.
+        """
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported GoWild index snapshot version: {snapshot.get('version')}")
+        airports = snapshot['airports']
+        for o, d, day, scraped_at in snapshot['searched']:
+            index._searched[(airports[o], airports[d], day)] = scraped_at
+        for o, d, day, *fields in snapshot['rows']:
+            destinations = index._index.setdefault(airports[o], {}).setdefault(day, {})
+            destinations[airports[d]] = destinations.get(airports[d], ()) + (GoWildFlight(*fields),)
+        return index
+
+
+def _describe(flight):
+    departs = minutes_to_datetime(flight.departs).strftime('%H:%M')
+    arrives = minutes_to_datetime(flight.arrives).strftime('%m-%d %H:%M')
+    return f"{flight.flight} {departs}→{arrives} ${flight.price:.2f}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Query the GoWild availability index.")
+    parser.add_argument("origin")
+    parser.add_argument("date", help="Departure date (YYYY-MM-DD)")
+    parser.add_argument("--via", nargs="?", const="", help="Show one-stop trips (optionally through this hub)")
+    parser.add_argument("--to", help="Only trips ending at this airport")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    index = GoWildIndex.load(args.snapshot)
+    if args.via is None:
+        for destination, flight in sorted(index.destinations(args.origin, args.date).items()):
+            if args.to in (None, destination):
+                print(f"{args.origin}→{destination}: {_describe(flight)}")
+    else:
+        for trip in index.two_hop(args.origin, args.date, hub=args.via or None, destination=args.to):
+            print(f"{trip.origin}→{trip.hub}→{trip.destination}: "
+                  f"{_describe(trip.first)} | {_describe(trip.second)}")
@@ -0,0 +1,182 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from block_classifier import classify_block
+from main import (
+    CaptchaDetectedException,
+    FRONTIER_BASE_URL,
+    ROTATING_PROXY_ENDPOINT,
+    build_internal_select_url,
+    create_stealth_driver,
+    parse_flight_page,
+    search_frontier_flights,
+)
+
+# Status codes the bot protection answers with instead of a page
+BLOCKED_STATUS_CODES = (403, 429)
+
+
+class HttpSearchSession:
+    """
+    A pooled requests.Session carrying a browser's cookies and user agent.
+
+    Once a real browser has passed the bot check, its cookies are enough to
+    fetch InternalSelect -> Select directly, which costs one HTTP round trip
+    instead of a full render.
+    """
+
+    def __init__(self, proxy_server=None, base_url=FRONTIER_BASE_URL, timeout=30, pool_size=10):
+        """
+        Args:
+            proxy_server (str): Proxy server to route through (format: "host:port"), or None for direct.
+            base_url (str): Scheme and host to search against (e.g. a local stand-in server).
+            timeout (float): Per-request timeout in seconds.
+            pool_size (int): Maximum keep-alive connections held per host.
+        """
+        self.proxy_server = proxy_server
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if proxy_server:
+            proxy_url = f"http://{proxy_server}"
+            self.session.proxies = {"http": proxy_url, "https": proxy_url}
+        self.session.headers.update({
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+
+    def import_browser_state(self, driver):
+        """
+        Copy cookies and the user agent from a browser that passed the bot check.
+
+        Args:
+            driver: A webdriver currently on (or just returned from) the booking site.
+        """
+        self.session.cookies.clear()
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        print(f"🍪 Imported {len(self.session.cookies)} cookies into HTTP session")
+
+    @property
+    def established(self):
+        """True once browser cookies have been imported."""
+        return len(self.session.cookies) > 0
+
+    def fetch_select_page(self, origin, destination, date_str, fare_type='DD'):
+        """
+        Fetch the Flight/Select HTML by following the InternalSelect redirects.
+
+        Returns:
+            The page HTML as a string.
+
+        Raises:
+            CaptchaDetectedException: When the response is a block page or the
+                                      redirect chain does not reach Flight/Select.
+        """
+        url = build_internal_select_url(origin, destination, date_str, base_url=self.base_url,
+                                        fare_type=fare_type)
+        return self.fetch_url(url)
+
+    def fetch_url(self, url):
+        """
+        Fetch any InternalSelect URL (e.g. a date-ribbon link) and return the Select HTML.
+
+        Raises:
+            CaptchaDetectedException: When the response is a block page or the
+                                      redirect chain does not reach Flight/Select.
+        """
+        response = self.session.get(url, timeout=self.timeout, allow_redirects=True)
+        if response.status_code in BLOCKED_STATUS_CODES:
+            raise CaptchaDetectedException(
+                f"HTTP {response.status_code} from {self.base_url} via proxy {self.proxy_server}")
+        response.raise_for_status()
+        block_reason = classify_block(response.text, url=response.url)
+        if block_reason:
+            raise CaptchaDetectedException(f"HTTP session got a block page ({block_reason})")
+        if "/Flight/Select" not in response.url:
+            raise CaptchaDetectedException(f"HTTP session was redirected to {response.url}")
+        return response.text
+
+    def search(self, origin, destination, date_str, fare_type='DD'):
+        """
+        Search over plain HTTP using the imported browser session.
+
+        Returns:
+            A list of fare dictionaries, or None if the page holds no usable flight data.
+
+        Raises:
+            CaptchaDetectedException: When the session is no longer trusted.
+        """
+        print(f"⚡ HTTP search {origin}→{destination} on {date_str}")
+        page_source = self.fetch_select_page(origin, destination, date_str, fare_type)
+        return parse_flight_page(page_source, date_str, self.proxy_server)
+
+    def close(self):
+        self.session.close()
+
+
+class HybridSearcher:
+    """
+    Pass the bot check once in a browser, then search over HTTP.
+
+    The first search (and any search after the HTTP session gets blocked) runs
+    in a real stealth browser; its cookies are then exported into an
+    HttpSearchSession that serves the following searches.
+    """
+
+    def __init__(self, use_proxy=True, base_url=FRONTIER_BASE_URL, driver_factory=None):
+        """
+        Args:
+            use_proxy (bool): Whether to use the rotating proxy endpoint.
+            base_url (str): Scheme and host to search against.
+            driver_factory (callable): Zero-argument callable returning a stealth driver
+                                       (default: create_stealth_driver on the proxy).
+        """
+        self.proxy_server = ROTATING_PROXY_ENDPOINT if use_proxy else None
+        self.base_url = base_url
+        self.driver_factory = driver_factory or (lambda: create_stealth_driver(self.proxy_server))
+        self.http = HttpSearchSession(proxy_server=self.proxy_server, base_url=base_url)
+
+    def search(self, origin, destination, date_str, fare_type='DD'):
+        """
+        Search for fares, over HTTP when a session is established, else in a browser.
+
+        Returns:
+            A list of fare dictionaries, or None if the search fails.
+
+        Raises:
+            CaptchaDetectedException: When the browser fallback is blocked too.
+        """
+        if self.http.established:
+            try:
+                return self.http.search(origin, destination, date_str, fare_type)
+            except CaptchaDetectedException as e:
+                print(f"🚫 HTTP session blocked ({e}), falling back to browser")
+                self.http.session.cookies.clear()
+            except requests.RequestException as e:
+                print(f"⚠️  HTTP search failed ({e}), falling back to browser")
+        return self._browser_search(origin, destination, date_str, fare_type)
+
+    def _browser_search(self, origin, destination, date_str, fare_type):
+        driver = self.driver_factory()
+        try:
+            fares = search_frontier_flights(origin, destination, date_str,
+                                            use_proxy=self.proxy_server is not None,
+                                            proxy_server=self.proxy_server, driver=driver,
+                                            fare_type=fare_type, base_url=self.base_url)
+            # Only a session that reached the fare data is worth reusing
+            if fares is not None:
+                self.http.import_browser_state(driver)
+            return fares
+        finally:
+            driver.quit()
+
+    def close(self):
+        self.http.close()
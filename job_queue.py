@@ -0,0 +1,546 @@
+"""
+Shared search queue so many worker processes and machines split route sweeps.
+
+The queue lives in one SQLite file on one host (WAL mode needs a local disk, so
+do not put it on NFS/SMB). Workers on that host open the file directly; workers
+on other machines lease over HTTP from ``serve`` running next to it. Serving
+beyond localhost requires a shared token (--token or $JOB_QUEUE_TOKEN).
+
+    python job_queue.py enqueue JFK-ATL DEN-LAS --start 2025-07-15 --days 14
+    JOB_QUEUE_TOKEN=s3cret python job_queue.py serve --host 0.0.0.0              # on the queue host
+    python job_queue.py work --concurrency 2                                     # same host
+    JOB_QUEUE_TOKEN=s3cret python job_queue.py --queue http://queue-host:8790 work  # other machines
+    python job_queue.py stats
+"""
+import argparse
+import hmac
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from fare_cache import cache_key
+from main import create_browser_pool, search_frontier_flights_with_retry
+from scheduler import SearchJob, SearchResult
+
+DEFAULT_QUEUE_PATH = "search_jobs.sqlite3"
+DEFAULT_QUEUE_PORT = 8790
+# Shared secret between serve_queue and RemoteJobQueue
+QUEUE_TOKEN_ENV = "JOB_QUEUE_TOKEN"
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+JOB_PENDING = "pending"
+JOB_LEASED = "leased"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_EXPIRED = "expired"   # departure date passed before anyone ran it
+
+# A job handed to a worker
+QueuedJob = namedtuple('QueuedJob', ['id', 'origin', 'destination', 'date', 'fare_type', 'attempts'])
+
+
+class JobQueue:
+    """
+    Durable search queue with leases, heartbeats and in-flight de-duplication.
+
+    Safe for many processes on the host that holds the database file; expose it
+    to other machines with serve_queue() and RemoteJobQueue. Workers lease the pending job whose departure is soonest; a lease that is not
+    renewed by ``heartbeat()`` within ``lease_seconds`` expires and the job goes
+    back to whoever asks next. Enqueuing a search that is already pending or
+    leased returns the existing job instead of adding a duplicate.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, lease_seconds=300, max_attempts=3):
+        """
+        Args:
+            path (str): SQLite database file on a local disk, shared by the processes on this host.
+            lease_seconds (float): How long a lease lasts without a heartbeat.
+            max_attempts (int): Leases a job gets before it is marked failed.
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                destination TEXT NOT NULL,
+                date TEXT NOT NULL,
+                fare_type TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                fares INTEGER,
+                error TEXT
+            )
+        """)
+        # At most one pending-or-leased job per search
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS jobs_in_flight ON jobs (key) "
+            f"WHERE state IN ('{JOB_PENDING}', '{JOB_LEASED}')")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_next ON jobs (state, date, id)")
+
+    def enqueue(self, origin, destination, date_str, fare_type='DD'):
+        """
+        Add a search unless the same search is already pending or running.
+
+        Returns:
+            A (job_id, created) tuple; ``created`` is False for a de-duplicated request.
+        """
+        datetime.strptime(date_str, '%Y-%m-%d')
+        key = cache_key(origin, destination, date_str, fare_type)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (key, origin, destination, date, fare_type, state, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, origin.upper(), destination.upper(), date_str, fare_type.upper(), JOB_PENDING, time.time()))
+            if cursor.rowcount:
+                return cursor.lastrowid, True
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND state IN (?, ?)", (key, JOB_PENDING, JOB_LEASED)).fetchone()
+        return row[0], False
+
+    def enqueue_many(self, routes, dates, fare_type='DD'):
+        """Enqueue every route/date pair; returns the number of new jobs."""
+        return sum(self.enqueue(job.origin, job.destination, job.date, fare_type)[1]
+                   for job in (SearchJob(o, d, day) for day in dates for o, d in routes))
+
+    def lease(self, worker_id):
+        """
+        Take the pending (or lease-expired) job with the nearest departure date.
+
+        Returns:
+            A QueuedJob, or None when nothing is available.
+        """
+        now = time.time()
+        today = date.today().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, finished_at = ? WHERE state IN (?, ?) AND date < ? "
+                    "AND (state = ? OR lease_until < ?)",
+                    (JOB_EXPIRED, now, JOB_PENDING, JOB_LEASED, today, JOB_PENDING, now))
+                # Lease-expired jobs that used up their attempts are given up on
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, finished_at = ?, error = 'lease expired' "
+                    "WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                    (JOB_FAILED, now, JOB_LEASED, now, self.max_attempts))
+                row = self._conn.execute(
+                    "SELECT id, origin, destination, date, fare_type, attempts FROM jobs "
+                    "WHERE state = ? OR (state = ? AND lease_until < ?) ORDER BY date, id LIMIT 1",
+                    (JOB_PENDING, JOB_LEASED, now)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1 "
+                        "WHERE id = ?", (JOB_LEASED, worker_id, now + self.lease_seconds, row[0]))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job_id, origin, destination, date_str, fare_type, attempts = row
+        return QueuedJob(job_id, origin, destination, date_str, fare_type, attempts + 1)
+
+    def heartbeat(self, job_id, worker_id):
+        """
+        Extend a lease.
+
+        Returns:
+            False when the lease was lost (expired and taken by another worker).
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = ?",
+                (time.time() + self.lease_seconds, job_id, worker_id, JOB_LEASED))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id, fares=0):
+        """Mark a leased job done; ignored if the lease was lost."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, fares = ?, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND state = ?",
+                (JOB_DONE, time.time(), fares, job_id, worker_id, JOB_LEASED))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """Return a leased job to the queue, or mark it failed once it has used all its attempts."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END, "
+                "error = ?, worker = NULL, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND state = ?",
+                (self.max_attempts, JOB_FAILED, JOB_PENDING, self.max_attempts, time.time(),
+                 str(error), job_id, worker_id, JOB_LEASED))
+        return cursor.rowcount == 1
+
+    def stats(self):
+        """Job counts by state."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# JobQueue methods a remote worker or producer may call
+REMOTE_METHODS = ("enqueue", "enqueue_many", "lease", "heartbeat", "complete", "fail", "stats")
+
+
+def serve_queue(queue, port=DEFAULT_QUEUE_PORT, host="127.0.0.1", token=None):
+    """
+    Expose a JobQueue to other machines over HTTP on a background thread.
+
+    Each call is ``POST /<method>`` with a JSON object of keyword arguments and
+    answers ``{"result": ...}``, or ``{"error": ...}`` with status 400 for a bad
+    request and 503 when the database is busy or failing, so leases stay
+    serialized by the one process that owns the SQLite file.
+
+    Args:
+        queue (JobQueue): The local queue to serve.
+        port (int): Port to listen on (0 picks a free one).
+        host (str): Interface to bind; anything but loopback needs ``token``.
+        token (str): Shared secret clients send as ``Authorization: Bearer <token>``.
+
+    Returns:
+        The running ThreadingHTTPServer.
+
+    Raises:
+        ValueError: When binding beyond loopback without a token.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    if not token and host not in LOOPBACK_HOSTS:
+        raise ValueError(f"Serving the queue on {host} needs a token (--token or ${QUEUE_TOKEN_ENV})")
+    expected = f"Bearer {token}".encode() if token else None
+
+    class Handler(BaseHTTPRequestHandler):
+        def _authorized(self):
+            if expected is None:
+                return True
+            if hmac.compare_digest(self.headers.get('Authorization', '').encode(), expected):
+                return True
+            self._send(401, {'error': "missing or wrong queue token"})
+            return False
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if self.path != '/config':
+                return self._send(404, {'error': f"unknown path {self.path}"})
+            self._send(200, {'result': {'lease_seconds': queue.lease_seconds}})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            method = self.path.strip('/')
+            if method not in REMOTE_METHODS:
+                return self._send(404, {'error': f"unknown method {method!r}"})
+            try:
+                kwargs = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                result = getattr(queue, method)(**kwargs)
+            except (TypeError, ValueError) as e:
+                return self._send(400, {'error': str(e)})
+            except sqlite3.Error as e:
+                # e.g. "database is locked"; the client retries
+                return self._send(503, {'error': f"queue database error: {e}"})
+            self._send(200, {'result': result._asdict() if isinstance(result, QueuedJob) else result})
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📋 Job queue served at http://{host}:{server.server_address[1]}")
+    return server
+
+
+class RemoteJobQueue:
+    """JobQueue client for a queue exposed with serve_queue(); a drop-in for run_worker."""
+
+    def __init__(self, url, timeout=30, token=None):
+        """
+        Args:
+            url (str): Base URL of the queue server, e.g. "http://queue-host:8790".
+            timeout (float): Request timeout in seconds.
+            token (str): Shared secret the server was started with (default: $JOB_QUEUE_TOKEN).
+        """
+        import requests  # deferred like proxy_manager.probe_proxy
+
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self._session = requests.Session()
+        token = token or os.environ.get(QUEUE_TOKEN_ENV)
+        if token:
+            self._session.headers['Authorization'] = f"Bearer {token}"
+        self._lock = threading.Lock()
+        response = self._session.get(f"{self.url}/config", timeout=timeout)
+        response.raise_for_status()
+        self.lease_seconds = response.json()['result']['lease_seconds']
+
+    def _call(self, method, **kwargs):
+        # requests.Session is not documented as thread-safe; heartbeats run on their own thread
+        with self._lock:
+            response = self._session.post(f"{self.url}/{method}", json=kwargs, timeout=self.timeout)
+        if response.status_code != 200:
+            try:
+                error = response.json().get('error')
+            except ValueError:
+                error = response.text[:200]
+            raise (ValueError if response.status_code < 500 else RuntimeError)(
+                f"Queue server answered {response.status_code} to {method}: {error}")
+        return response.json()['result']
+
+    def enqueue(self, origin, destination, date_str, fare_type='DD'):
+        return tuple(self._call("enqueue", origin=origin, destination=destination, date_str=date_str,
+                                fare_type=fare_type))
+
+    def enqueue_many(self, routes, dates, fare_type='DD'):
+        return self._call("enqueue_many", routes=[list(route) for route in routes], dates=list(dates),
+                          fare_type=fare_type)
+
+    def lease(self, worker_id):
+        job = self._call("lease", worker_id=worker_id)
+        return QueuedJob(**job) if job is not None else None
+
+    def heartbeat(self, job_id, worker_id):
+        return self._call("heartbeat", job_id=job_id, worker_id=worker_id)
+
+    def complete(self, job_id, worker_id, fares=0):
+        return self._call("complete", job_id=job_id, worker_id=worker_id, fares=fares)
+
+    def fail(self, job_id, worker_id, error):
+        return self._call("fail", job_id=job_id, worker_id=worker_id, error=str(error))
+
+    def stats(self):
+        return self._call("stats")
+
+    def close(self):
+        self._session.close()
+
+
+def open_queue(location, token=None):
+    """A RemoteJobQueue for an http(s):// URL, else a JobQueue on that SQLite file."""
+    if location.startswith(("http://", "https://")):
+        return RemoteJobQueue(location, token=token)
+    return JobQueue(location)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def _heartbeat_loop(queue, job, worker_id, stop, interval):
+    while not stop.wait(interval):
+        try:
+            alive = queue.heartbeat(job.id, worker_id)
+        except Exception as e:
+            # Beats come every lease/3, so one or two misses still keep the lease
+            print(f"⚠️  Heartbeat for job {job.id} failed ({e}), will retry")
+            continue
+        if not alive:
+            print(f"⚠️  Lost lease on job {job.id} ({job.origin}→{job.destination} {job.date})")
+            return
+
+
+def _call_queue(call, stop, poll_interval, *args):
+    """
+    Run a queue call, retrying every ``poll_interval`` seconds while it raises
+    (a remote queue may be unreachable or busy).
+
+    Returns:
+        The call's result, or None if ``stop`` was set before it succeeded.
+    """
+    while True:
+        try:
+            return call(*args)
+        except Exception as e:
+            print(f"⚠️  Queue {call.__name__} failed ({e}); retrying in {poll_interval:g}s")
+            if stop.wait(poll_interval):
+                return None
+
+
+def run_worker(queue, worker_id=None, use_proxy=True, max_retries=3, pool=None, search_fn=None,
+               persist=None, poll_interval=5.0, exit_when_idle=False, stop=None):
+    """
+    Lease jobs from ``queue`` and run them until stopped.
+
+    Args:
+        queue (JobQueue or RemoteJobQueue): The shared queue.
+        worker_id (str): Identifies this worker in leases (default: host-pid-random).
+        use_proxy (bool): Whether to use the rotating proxy endpoint.
+        max_retries (int): Retry budget per lease (proxy rotation inside one attempt).
+        pool (BrowserPool): Pool to lease browsers from (default: a single-browser pool).
+        search_fn (callable): Override for the search, called as
+                              ``search_fn(origin, destination, date_str, fare_type)``; it returns
+                              fares, ``[]`` when the date has no flights, or None on failure.
+        persist (callable): Called with a SearchResult for each successful job
+                            (e.g. pipeline.history_persister(history)).
+        poll_interval (float): Seconds to wait when the queue is empty.
+        exit_when_idle (bool): Return once the queue has nothing to lease.
+        stop (threading.Event): Set to ask the worker to finish its current job and return.
+
+    Returns:
+        The number of jobs completed.
+    """
+    worker_id = worker_id or default_worker_id()
+    stop = stop or threading.Event()
+    owns_pool = pool is None and search_fn is None
+    if owns_pool:
+        pool = create_browser_pool(size=1, use_proxy=use_proxy)
+    if search_fn is None:
+        def search_fn(origin, destination, date_str, fare_type):
+            return search_frontier_flights_with_retry(origin, destination, date_str, use_proxy=use_proxy,
+                                                      max_retries=max_retries, pool=pool, fare_type=fare_type)
+
+    completed = 0
+    print(f"👷 Worker {worker_id} started")
+    try:
+        while not stop.is_set():
+            job = _call_queue(queue.lease, stop, poll_interval, worker_id)
+            if job is None:
+                if exit_when_idle:
+                    break
+                stop.wait(poll_interval)
+                continue
+
+            print(f"\n📦 Job {job.id}: {job.origin}→{job.destination} on {job.date} (attempt {job.attempts})")
+            beating = threading.Event()
+            heart = threading.Thread(target=_heartbeat_loop,
+                                     args=(queue, job, worker_id, beating, queue.lease_seconds / 3),
+                                     daemon=True)
+            heart.start()
+            started = time.time()
+            try:
+                try:
+                    fares = search_fn(job.origin, job.destination, job.date, job.fare_type)
+                except Exception as e:
+                    fares, error = None, e
+                else:
+                    error = None if fares is not None else "search failed"
+
+                # Keep the lease alive until the queue has taken the outcome
+                if error is not None:
+                    _call_queue(queue.fail, stop, poll_interval, job.id, worker_id, error)
+                    continue
+                if not fares:
+                    # A "no flights" answer is a result: re-scraping the date would only get it again
+                    print(f"🈳 No flights {job.origin}→{job.destination} on {job.date}")
+                recorded = _call_queue(queue.complete, stop, poll_interval, job.id, worker_id, len(fares))
+            finally:
+                beating.set()
+                heart.join()
+            if recorded:
+                completed += 1
+                if persist is not None:
+                    persist(SearchResult(SearchJob(job.origin, job.destination, job.date), fares, None,
+                                         time.time() - started))
+    finally:
+        if owns_pool:
+            pool.close()
+    print(f"👷 Worker {worker_id} finished {completed} jobs")
+    return completed
+
+
+def _parse_route(text):
+    origin, _, destination = text.upper().partition('-')
+    if len(origin) != 3 or len(destination) != 3:
+        raise argparse.ArgumentTypeError(f"Route must look like JFK-ATL, got {text!r}")
+    return origin, destination
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Shared search queue for multi-process route sweeps.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH,
+                        help="SQLite queue file on this host, or http://host:port of a queue server")
+    parser.add_argument("--token", default=os.environ.get(QUEUE_TOKEN_ENV),
+                        help=f"Shared secret for the queue server (default: ${QUEUE_TOKEN_ENV})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Add route/date searches")
+    enqueue.add_argument("routes", nargs="+", type=_parse_route, help="Routes like JFK-ATL")
+    enqueue.add_argument("--start", default=date.today().isoformat(), help="First date (YYYY-MM-DD)")
+    enqueue.add_argument("--days", type=int, default=1)
+    enqueue.add_argument("--fare-type", default="DD")
+
+    work = commands.add_parser("work", help="Run worker threads against the queue")
+    work.add_argument("--concurrency", type=int, default=1)
+    work.add_argument("--no-proxy", action="store_true")
+    work.add_argument("--max-retries", type=int, default=3)
+    work.add_argument("--exit-when-idle", action="store_true")
+
+    serve = commands.add_parser("serve", help="Serve the queue file to workers on other machines")
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to bind (non-loopback needs a token)")
+    serve.add_argument("--port", type=int, default=DEFAULT_QUEUE_PORT)
+
+    commands.add_parser("stats", help="Show job counts by state")
+    args = parser.parse_args()
+
+    job_queue = open_queue(args.queue, token=args.token)
+    if args.command == "enqueue":
+        start = datetime.strptime(args.start, '%Y-%m-%d')
+        dates = [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(args.days)]
+        added = job_queue.enqueue_many(args.routes, dates, fare_type=args.fare_type)
+        print(f"📋 Enqueued {added} new searches ({len(args.routes) * len(dates) - added} already in flight)")
+    elif args.command == "serve":
+        if isinstance(job_queue, RemoteJobQueue):
+            parser.error("serve needs a local queue file, not a URL")
+        try:
+            server = serve_queue(job_queue, port=args.port, host=args.host, token=args.token)
+        except ValueError as e:
+            parser.error(str(e))
+        try:
+            while True:
+                time.sleep(60)
+                print(f"Queue: {job_queue.stats()}")
+        except KeyboardInterrupt:
+            print("Stopping queue server")
+            server.shutdown()
+    elif args.command == "work":
+        from fare_store import FareHistory
+        from pipeline import history_persister
+
+        persist = history_persister(FareHistory())
+        stop_event = threading.Event()
+        workers = [threading.Thread(target=run_worker, args=(job_queue,),
+                                    kwargs={'use_proxy': not args.no_proxy, 'max_retries': args.max_retries,
+                                            'persist': persist, 'exit_when_idle': args.exit_when_idle,
+                                            'stop': stop_event})
+                   for _ in range(args.concurrency)]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(1.0)
+        except KeyboardInterrupt:
+            print("Stopping after the current jobs...")
+            stop_event.set()
+            for worker in workers:
+                worker.join()
+    print(f"Queue: {job_queue.stats()}")
+    job_queue.close()
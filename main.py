@@ -1,19 +1,19 @@
-import requests
+import gzip
 import json
-import re
+import os
 import time
 import random
-from bs4 import BeautifulSoup
+from collections import namedtuple
 from urllib.parse import urlencode
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium_stealth import stealth
+from block_classifier import classify_block
+from browser_pool import BrowserPool
+from fare_store import FareHistory, fare_records_from_cells
+from extractor import extract_flight_data, extract_flight_data_in_browser, fare_cells_from_flight_data, split_journeys
+from metrics import SearchMetrics
+from proxy_manager import probe_proxy
+from readiness import (DEFAULT_PACING, PhaseTimer, READY_CAPTCHA, READY_DATA, READY_NO_FLIGHTS,
+                       READY_TIMEOUT, wait_for_page_ready)
 
 # List of realistic user agents to rotate through
 USER_AGENTS = [
@@ -26,70 +26,354 @@ USER_AGENTS = [
 # Rotating proxy endpoint - each connection gets a different IP automatically
 ROTATING_PROXY_ENDPOINT = "p.webshare.io:9999"
 
+# Frontier booking site that hosts the InternalSelect -> Select flow
+FRONTIER_BASE_URL = "https://booking.flyfrontier.com"
+
+# Where the resolved chromedriver binary is pinned, so later runs skip webdriver_manager
+# (and work offline). Set CHROMEDRIVER_PATH to use a specific binary instead.
+CHROMEDRIVER_MANIFEST = "chromedriver_manifest.json"
+_chromedriver_path = None
+
+# Requests the lightweight profile drops via CDP: images, fonts and media by extension,
+# plus the analytics / ad / consent hosts the Select page pulls in. The site's own
+# scripts and the bot-protection sensor are never blocked.
+LIGHTWEIGHT_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg",
+    "*clarip.com*", "*googletagmanager.com*", "*google-analytics.com*", "*googleadservices.com*",
+    "*doubleclick.net*", "*facebook.net*", "*analytics.tiktok.com*", "*pinterest.com*", "*pinimg.com*",
+    "*sojern.com*", "*clicktripz.com*", "*travelaudience.com*", "*adnxs.com*", "*adform.net*",
+    "*fullstory.com*", "*noibu.com*", "*oracleinfinity.io*", "*securitytrfx.com*", "*mczbf.com*",
+]
+
+# Caps on the lightweight profile's renderer: V8 heap (MB) and renderer processes
+LIGHTWEIGHT_JS_HEAP_MB = 512
+LIGHTWEIGHT_RENDERER_LIMIT = 2
+
+# Travellers on a booking: adults (ADT), children (CHD) and lap infants (INF)
+Passengers = namedtuple('Passengers', ['adults', 'children', 'infants'])
+ONE_ADULT = Passengers(1, 0, 0)
+
+# Both legs of a round-trip search, as fare-cell lists
+RoundTripFares = namedtuple('RoundTripFares', ['outbound', 'inbound'])
+
 class CaptchaDetectedException(Exception):
     """Custom exception to signal CAPTCHA detection and trigger retry with new proxy"""
     pass
 
-def test_proxy_connection():
+def test_proxy_connection(proxy_server=ROTATING_PROXY_ENDPOINT):
     """
-    Test the proxy connection using Selenium with detection prevention.
+    Test the proxy connection with a single lightweight HTTP request.
+    
+    Args:
+        proxy_server (str): Proxy to test (format: "host:port").
     
     Returns:
         bool: True if proxy is working, False otherwise.
     """
-    print("Testing proxy connection with Selenium...")
+    print(f"Testing proxy connection to {proxy_server}...")
+    ok, latency, detail = probe_proxy(proxy_server)
+    if ok:
+        print(f"✓ Proxy working! Your IP through proxy: {detail} ({latency:.2f}s)")
+    else:
+        print(f"✗ Proxy test failed with error: {detail}")
+    return ok
+
+def build_internal_select_url(origin, destination, date_str, base_url=FRONTIER_BASE_URL, fare_type='DD',
+                              return_date=None, passengers=None):
+    """
+    Build the InternalSelect search URL that redirects to the Flight/Select page.
+
+    Args:
+        origin (str): The 3-letter IATA code for the origin airport.
+        destination (str): The 3-letter IATA code for the destination airport.
+        date_str (str): The departure date in 'YYYY-MM-DD' format.
+        base_url (str): Scheme and host to search against.
+        fare_type (str): 'DD' for Discount Den fares, 'STD' for Standard.
+        return_date (str): Return date in 'YYYY-MM-DD' format for a round trip (default: one way).
+        passengers (Passengers): Travellers to price for (default: ONE_ADULT).
+
+    Returns:
+        The full InternalSelect URL.
+
+    Raises:
+        ValueError: If a date is not in 'YYYY-MM-DD' format, the return is before the
+                    departure, or the passenger counts are not bookable.
+    """
+    passengers = passengers or ONE_ADULT
+    if passengers.adults < 1 or passengers.children < 0 or not 0 <= passengers.infants <= passengers.adults:
+        raise ValueError(f"Unbookable passenger mix: {passengers}")
+
+    # Convert date string 'YYYY-MM-DD' to 'Mon DD, YYYY' format
+    dt_object = datetime.strptime(date_str, '%Y-%m-%d')
+    formatted_date = dt_object.strftime('%b %d, %Y')  # e.g., 'Jun 16, 2025'
+
+    # https://booking.flyfrontier.com/Flight/InternalSelect?o1=JFK&d1=ATL&dd1=Jun%2016,%202025&ADT=1&mon=true&promo=&ftype=DD
+    params_internal = {
+        'o1': origin,
+        'd1': destination,
+        'dd1': formatted_date,
+        'ADT': passengers.adults,
+        'mon': 'true',
+        'promo': '',
+        'ftype': fare_type  # DD for Discount Den, use 'STD' for Standard
+    }
+    if return_date:
+        return_dt = datetime.strptime(return_date, '%Y-%m-%d')
+        if return_dt < dt_object:
+            raise ValueError(f"Return date {return_date} is before departure {date_str}")
+        # Both legs come back on one Select page, as two journeys
+        params_internal['dd2'] = return_dt.strftime('%b %d, %Y')
+        params_internal['r'] = 'true'
+    if passengers.children:
+        params_internal['CHD'] = passengers.children
+    if passengers.infants:
+        params_internal['INF'] = passengers.infants
+    return f"{base_url}/Flight/InternalSelect?{urlencode(params_internal)}"
+
+def archive_page(page_content, prefix="flight_select_page"):
+    """
+    Write a page to a timestamped, gzip-compressed ``{prefix}_{timestamp}.html.gz`` file.
+
+    Returns:
+        The filename written.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{prefix}_{timestamp}.html.gz"
+    with gzip.open(filename, 'wt', encoding='utf-8') as f:
+        f.write(page_content)
+    return filename
+
+def parse_flight_page(page_source, date_str, proxy_server=None, save_debug=False):
+    """
+    Extract the fare cells from a Flight/Select page.
+
+    Args:
+        page_source (str): The HTML of the Flight/Select page.
+        date_str (str): The departure date searched, used in messages.
+        proxy_server (str): The proxy the page was fetched through, used in messages.
+        save_debug (bool): Archive a page without flight data to a compressed
+                           debug_page_source_{timestamp}.html.gz file for analysis.
+
+    Returns:
+        A list of fare dictionaries (empty when the site reports no flights on this
+        date), or None if the page holds no usable flight data.
+
+    Raises:
+        CaptchaDetectedException: When the page is a CAPTCHA or security check.
+    """
+    # Scan straight to the embedded FlightData (or legacy `var model`) payload
+    extracted = extract_flight_data(page_source)
+    
+    if extracted is None:
+        # Check for a block page first, then for specific error messages
+        block_reason = classify_block(page_source)
+        if block_reason:
+            print(f"\n⚠️  CAPTCHA or security check detected with proxy {proxy_server} ({block_reason})!")
+            print("Raising exception to trigger retry with different proxy...")
+            raise CaptchaDetectedException(f"CAPTCHA detected with proxy {proxy_server}: {block_reason}")
+        elif "no direct flights are available" in page_source.lower():
+            print(f"\nNo flights found for this route on {date_str}.")
+            return []
+        else:
+            print("\nError: Could not find the flight data script in the HTML response.")
+            if save_debug:
+                filename = archive_page(page_source, prefix="debug_page_source")
+                print(f"Page source saved to {filename} for analysis.")
+            return None
+
+    # Navigate the payload to get the fare cells
+    fare_cells, error_message = fare_cells_from_flight_data(*extracted)
+    if fare_cells is None:
+        print(f"\nNo flights for this route on {date_str}: {error_message}")
+        return []
     
+    print(f"Successfully extracted {len(fare_cells)} fare options.")
+    return fare_cells
+
+def resolve_chromedriver_path(manifest_path=CHROMEDRIVER_MANIFEST, refresh=False):
+    """
+    Find the chromedriver binary, resolving it with webdriver_manager only when needed.
+
+    The first resolution is pinned in ``manifest_path``; later calls (in this or
+    any other process) reuse it without version checks or network access as long
+    as the binary still exists.
+
+    Args:
+        manifest_path (str): JSON file recording the resolved driver path.
+        refresh (bool): Ignore the manifest and resolve again (e.g. after a Chrome update).
+
+    Returns:
+        The path of the chromedriver executable.
+    """
+    global _chromedriver_path
+    override = os.environ.get("CHROMEDRIVER_PATH")
+    if override:
+        return override
+    if not refresh:
+        if _chromedriver_path and os.path.exists(_chromedriver_path):
+            return _chromedriver_path
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                pinned = json.load(f).get('path')
+            if pinned and os.path.exists(pinned):
+                _chromedriver_path = pinned
+                return pinned
+        except (OSError, ValueError):
+            pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    print("🔧 Resolving chromedriver with webdriver_manager...")
+    _chromedriver_path = ChromeDriverManager().install()
+    try:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'path': _chromedriver_path, 'resolved_at': datetime.now().isoformat()}, f)
+    except OSError as e:
+        print(f"⚠️  Could not write {manifest_path}: {e}")
+    return _chromedriver_path
+
+def create_stealth_driver(proxy_server=None, user_agent=None, lightweight=False):
+    """
+    Start a Chrome driver with the stealth options and patches used for scraping.
+
+    Args:
+        proxy_server (str): Proxy server to route through (format: "host:port"), or None for direct.
+        user_agent (str): User agent to present (default: a random entry from USER_AGENTS).
+        lightweight (bool): Scraping profile: new headless mode (with the explicit user agent,
+                            so it does not announce HeadlessChrome), images/fonts/media and
+                            third-party hosts in LIGHTWEIGHT_BLOCKED_URLS blocked via CDP,
+                            and a capped renderer heap and process count.
+
+    Returns:
+        A stealth-configured webdriver instance.
+    """
+    # Browser dependencies load on first use so parsing, cache and HTTP-only paths start fast
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium_stealth import stealth
+
     # Configure Chrome options for stealth mode
     options = Options()
-    options.add_argument("--headless")  # Run in background for testing
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+    # The default profile is headed to avoid detection; the lightweight one relies on
+    # the new headless mode, which renders like regular Chrome
+    if lightweight:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-web-security")
+    # Chrome only honours the last --disable-features flag, so keep them in one
+    disabled_features = ["VizDisplayCompositor"]
+    if lightweight:
+        disabled_features += ["Translate", "MediaRouter", "OptimizationHints", "InterestFeedContentSuggestions"]
+    options.add_argument(f"--disable-features={','.join(disabled_features)}")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
+    options.add_experimental_option("useAutomationExtension", False)
     
-    # Add proxy configuration with IP authentication
-    options.add_argument("--proxy-server=http://p.webshare.io:9999")
+    # Configure proxy if enabled
+    if proxy_server:
+        # Use the specified proxy server
+        options.add_argument(f"--proxy-server=http://{proxy_server}")
+        print(f"Configured proxy: {proxy_server} (IP authentication)")
+    else:
+        print("Using direct connection (no proxy)")
     
     # Add realistic user agent
-    user_agent = random.choice(USER_AGENTS)
+    if user_agent is None:
+        user_agent = random.choice(USER_AGENTS)
     options.add_argument(f"--user-agent={user_agent}")
     
-    driver = None
+    # Additional stealth options
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-client-side-phishing-detection")
+    options.add_argument("--disable-default-apps")
+    options.add_argument("--disable-hang-monitor")
+    options.add_argument("--disable-popup-blocking")
+    options.add_argument("--disable-prompt-on-repost")
+    options.add_argument("--disable-sync")
+    options.add_argument("--metrics-recording-only")
+    options.add_argument("--no-first-run")
+    options.add_argument("--safebrowsing-disable-auto-update")
+
+    if lightweight:
+        options.add_argument(f"--js-flags=--max-old-space-size={LIGHTWEIGHT_JS_HEAP_MB}")
+        options.add_argument(f"--renderer-process-limit={LIGHTWEIGHT_RENDERER_LIMIT}")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-component-extensions-with-background-pages")
+        options.add_argument("--mute-audio")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    # Initialize the webdriver
     try:
-        # Initialize the webdriver
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        
-        # Apply stealth settings
-        stealth(driver,
-                languages=["en-US", "en"],
-                vendor="Google Inc.",
-                platform="Win32",
-                webgl_vendor="Intel Inc.",
-                renderer="Intel Iris OpenGL Engine",
-                fix_hairline=True)
-        
-        # Test proxy by visiting httpbin.org
-        driver.get('http://httpbin.org/ip')
-        
-        # Wait for the page to load and extract IP
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "pre"))
-        )
-        
-        ip_element = driver.find_element(By.TAG_NAME, "pre")
-        ip_data = json.loads(ip_element.text)
-        print(f"✓ Proxy working! Your IP through proxy: {ip_data['origin']}")
-        return True
-        
-    except Exception as e:
-        print(f"✗ Proxy test failed with error: {e}")
-        return False
-    finally:
-        if driver:
-            driver.quit()
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()), options=options)
+    except SessionNotCreatedException:
+        # The pinned driver no longer matches the installed Chrome
+        print("⚠️  Pinned chromedriver does not match Chrome, resolving again...")
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver_path(refresh=True)), options=options)
+    
+    if lightweight:
+        # Drop heavy and third-party requests before they reach the proxy
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LIGHTWEIGHT_BLOCKED_URLS})
+    
+    # Apply stealth settings
+    stealth(driver,
+            languages=["en-US", "en"],
+            vendor="Google Inc.",
+            platform="Win32",
+            webgl_vendor="Intel Inc.",
+            renderer="Intel Iris OpenGL Engine",
+            fix_hairline=True)
+    
+    return driver
 
-def search_frontier_flights_with_retry(origin, destination, date_str, use_proxy=True, max_retries=3):
+def create_browser_pool(size=2, use_proxy=True, max_uses=20, lightweight=False):
+    """
+    Build a BrowserPool of stealth drivers for repeated searches.
+
+    Args:
+        size (int): Maximum number of concurrent browsers.
+        use_proxy (bool): Whether pooled browsers go through the rotating proxy endpoint.
+        max_uses (int): Number of searches after which a browser is replaced.
+        lightweight (bool): Start pooled browsers with the lightweight scraping profile.
+
+    Returns:
+        A BrowserPool instance (call ``warm()`` to pre-start the browsers).
+    """
+    proxy_server = ROTATING_PROXY_ENDPOINT if use_proxy else None
+    return BrowserPool(lambda: create_stealth_driver(proxy_server, lightweight=lightweight),
+                       size=size, max_uses=max_uses)
+
+def _search_once(origin, destination, date_str, use_proxy, proxy_server=None, pool=None, fare_type='DD',
+                 timer=None, return_date=None, passengers=None, deadline=None):
+    """Run a single search, on a leased pool browser when a pool is given."""
+    if pool is None:
+        return search_frontier_flights(origin, destination, date_str, use_proxy=use_proxy,
+                                       proxy_server=proxy_server, fare_type=fare_type, timer=timer,
+                                       return_date=return_date, passengers=passengers, deadline=deadline)
+    with pool.lease() as driver:
+        return search_frontier_flights(origin, destination, date_str, use_proxy=use_proxy,
+                                       proxy_server=proxy_server, driver=driver, fare_type=fare_type,
+                                       timer=timer, return_date=return_date, passengers=passengers,
+                                       deadline=deadline)
+
+def _sleep_until(seconds, deadline=None):
+    """Sleep ``seconds``, but never past ``deadline`` (a time.time() value)."""
+    if deadline is not None:
+        seconds = min(seconds, deadline - time.time())
+    if seconds > 0:
+        time.sleep(seconds)
+
+def search_frontier_flights_with_retry(origin, destination, date_str, use_proxy=True, max_retries=3, pool=None,
+                                       fare_type='DD', proxy_manager=None, return_date=None, passengers=None,
+                                       deadline=None):
     """
     Wrapper function that handles CAPTCHA detection and proxy rotation.
     Since we're using a rotating proxy endpoint, each retry automatically gets a different IP.
@@ -100,47 +384,187 @@ def search_frontier_flights_with_retry(origin, destination, date_str, use_proxy=
         date_str (str): The departure date in 'YYYY-MM-DD' format.
         use_proxy (bool): Whether to use the rotating proxy endpoint.
         max_retries (int): Maximum number of retries (each gets a different IP automatically).
+        pool (BrowserPool): Optional pool of warm browsers to lease from instead of starting
+                            Chrome for every attempt. Browsers that hit a CAPTCHA are recycled.
+        fare_type (str): 'DD' for Discount Den fares, 'STD' for Standard.
+        proxy_manager (ProxyManager): Optional health-aware router across several proxy endpoints.
+                                      Each attempt goes to the healthiest endpoint (sticky per route),
+                                      its outcome is recorded, and waits use exponential backoff.
+        return_date (str): Return date in 'YYYY-MM-DD' format for a round trip; both legs'
+                           cells are returned, flagged by ``isReturnTrip``.
+        passengers (Passengers): Travellers to price for (default: ONE_ADULT).
+        deadline (float): time.time() after which no new attempt starts; waits between
+                          attempts and the page readiness wait are cut short to meet it.
     
     Returns:
-        A list of fare dictionaries, or None if all attempts fail.
+        A list of fare dictionaries (empty when the site reports no flights, which is not
+        retried), or None if all attempts fail or the deadline passes.
+
+    Every call produces one SearchMetrics record (phase spans across all attempts, retries,
+    CAPTCHAs, bytes read, proxy and outcome) that is handed to the sinks registered with
+    ``metrics.add_sink``.
     """
+    metrics = SearchMetrics(origin, destination, date_str, fare_type=fare_type)
     if not use_proxy:
         print("Proxy disabled, attempting direct connection...")
-        return search_frontier_flights(origin, destination, date_str, use_proxy=False)
+        try:
+            result = _search_once(origin, destination, date_str, use_proxy=False, pool=pool,
+                                  fare_type=fare_type, timer=metrics, return_date=return_date,
+                                  passengers=passengers, deadline=deadline)
+        except CaptchaDetectedException:
+            metrics.count("captchas")
+            metrics.finish("captcha")
+            raise
+        metrics.finish("failed" if result is None else "ok" if result else "no_results")
+        return result
+    
+    if proxy_manager is not None and pool is not None:
+        raise ValueError("Pooled browsers keep the proxy they were started with; use either pool or proxy_manager")
     
+    proxy_server = None
     for attempt in range(max_retries):
-        print(f"\n🔄 Attempt {attempt + 1}/{max_retries} using rotating proxy endpoint")
-        print(f"Note: Each connection to {ROTATING_PROXY_ENDPOINT} gets a different IP automatically")
+        if deadline is not None and time.time() >= deadline:
+            print(f"⏱️  Deadline reached before attempt {attempt + 1}, giving up")
+            metrics.finish("timeout", proxy=proxy_server)
+            return None
+        if attempt:
+            metrics.count("retries")
+        proxy_server = ROTATING_PROXY_ENDPOINT
+        if proxy_manager is not None:
+            proxy_server = proxy_manager.choose(session_key=f"{origin}-{destination}")
+            if proxy_server is None:
+                wait_time = proxy_manager.seconds_until_available()
+                print(f"🔌 All proxy circuits are open, waiting {wait_time:.1f} seconds...")
+                _sleep_until(wait_time, deadline)
+                proxy_server = proxy_manager.choose(session_key=f"{origin}-{destination}")
+                if proxy_server is None:
+                    continue
+            print(f"\n🔄 Attempt {attempt + 1}/{max_retries} using proxy {proxy_server}")
+        else:
+            print(f"\n🔄 Attempt {attempt + 1}/{max_retries} using rotating proxy endpoint")
+            print(f"Note: Each connection to {ROTATING_PROXY_ENDPOINT} gets a different IP automatically")
         
+        started = time.time()
+        pages_loaded = metrics.counters.get("pages_loaded", 0)
         try:
-            result = search_frontier_flights(origin, destination, date_str, 
-                                           use_proxy=True, proxy_server=ROTATING_PROXY_ENDPOINT)
-            if result is not None:
+            result = _search_once(origin, destination, date_str, use_proxy=True,
+                                  proxy_server=proxy_server, pool=pool, fare_type=fare_type, timer=metrics,
+                                  return_date=return_date, passengers=passengers, deadline=deadline)
+            if proxy_manager is not None:
+                # "No flights" is the site's answer, not the proxy's fault; only errors and blocks count against it
+                page_loaded = metrics.counters.get("pages_loaded", 0) > pages_loaded
+                proxy_manager.record(proxy_server, result is not None or page_loaded, time.time() - started)
+            if result:
                 print(f"✅ Success on attempt {attempt + 1}")
+                metrics.finish("ok", proxy=proxy_server)
+                return result
+            elif result is not None:
+                print(f"✅ Attempt {attempt + 1} loaded the page: no flights on this date")
+                metrics.finish("no_results", proxy=proxy_server)
                 return result
             else:
-                print(f"⚠️  No results on attempt {attempt + 1}, but no CAPTCHA detected")
+                print(f"⚠️  No usable page on attempt {attempt + 1}, but no CAPTCHA detected")
                 
         except CaptchaDetectedException as e:
             print(f"🚫 CAPTCHA detected on attempt {attempt + 1}")
+            metrics.count("captchas")
+            if proxy_manager is not None:
+                proxy_manager.record(proxy_server, False, time.time() - started, captcha=True)
             print(f"Next attempt will automatically use a different IP from the rotating proxy...")
             
             # Add some delay before next attempt to let the rotation take effect
             if attempt < max_retries - 1:  # Don't sleep on the last attempt
-                sleep_time = random.uniform(15.0, 25.0)
+                if proxy_manager is not None:
+                    sleep_time = proxy_manager.backoff(attempt, base=5.0)
+                else:
+                    sleep_time = random.uniform(15.0, 25.0)
                 print(f"Waiting {sleep_time:.1f} seconds before next attempt...")
-                time.sleep(sleep_time)
+                _sleep_until(sleep_time, deadline)
                 
         except Exception as e:
             print(f"❌ Error on attempt {attempt + 1}: {e}")
+            if proxy_manager is not None:
+                proxy_manager.record(proxy_server, False, time.time() - started)
             if attempt < max_retries - 1:
                 print(f"Will retry with a new IP from the rotating proxy...")
-                time.sleep(random.uniform(5.0, 10.0))
+                if proxy_manager is not None:
+                    _sleep_until(proxy_manager.backoff(attempt), deadline)
+                else:
+                    _sleep_until(random.uniform(5.0, 10.0), deadline)
     
     print(f"\n❌ All {max_retries} retry attempts failed with rotating proxy")
+    metrics.finish("failed", proxy=proxy_server)
     return None
 
-def search_frontier_flights(origin, destination, date_str, use_proxy=False, proxy_server=None):
+def load_select_page(driver, internal_select_url, date_str, proxy_server=None, timer=None, save_page=False,
+                     deadline=None):
+    """
+    Navigate to InternalSelect and wait until the Flight/Select page shows an outcome.
+
+    Args:
+        driver: A stealth-configured webdriver.
+        internal_select_url (str): URL from build_internal_select_url.
+        date_str (str): The departure date searched, used in messages.
+        proxy_server (str): The proxy in use, used in messages.
+        timer (PhaseTimer): Collects per-phase durations.
+        save_page (bool): Archive the Flight/Select HTML to a timestamped .html.gz file.
+        deadline (float): time.time() by which the readiness wait must end (default: wait up to 60s).
+
+    Returns:
+        True when there is flight data to extract (or the wait timed out and the
+        page should be inspected anyway), False when the site reported no flights.
+
+    Raises:
+        CaptchaDetectedException: When the page is a CAPTCHA or security check.
+    """
+    timer = timer or PhaseTimer()
+    print(f"Step 2: Navigating to search URL and following redirects...")
+    with timer.phase("navigate"):
+        driver.get(internal_select_url)
+    
+    # Step 3: Wait for the redirect chain to land and an outcome to appear
+    print("Step 3: Waiting for flight data to load...")
+    target_pattern = "/Flight/Select"
+    with timer.phase("readiness"):
+        timeout = 60 if deadline is None else max(0.0, min(60, deadline - time.time()))
+        outcome, info = wait_for_page_ready(driver, target_pattern=target_pattern, timeout=timeout)
+    final_url = info["url"] or ""
+    timer.count("redirects", info["redirects"])
+    print(f"Readiness: {outcome} after {info['redirects']} redirects. Final URL: {final_url}")
+    
+    if outcome == READY_CAPTCHA:
+        print(f"\n⚠️  CAPTCHA or security check detected with proxy {proxy_server} ({info['block_reason']})!")
+        print("Raising exception to trigger retry with different proxy...")
+        raise CaptchaDetectedException(f"CAPTCHA detected with proxy {proxy_server}: {info['block_reason']}")
+    if outcome in (READY_DATA, READY_NO_FLIGHTS):
+        # The site answered through this connection, whatever it said
+        timer.count("pages_loaded")
+    if outcome == READY_NO_FLIGHTS:
+        print(f"\nNo flights found for this route on {date_str}.")
+        return False
+    if outcome == READY_TIMEOUT:
+        print("Timeout waiting for page content, proceeding anyway...")
+        if target_pattern not in final_url:
+            print(f"⚠️  Warning: Did not reach Flight/Select page. Final URL: {final_url}")
+    
+    if outcome == READY_DATA and save_page:
+        # Save the page content when we reach Flight/Select
+        print("💾 Saving Flight/Select page content...")
+        with timer.phase("save_page"):
+            try:
+                page_content = driver.page_source
+                timer.count("page_source_bytes", len(page_content))
+                filename = archive_page(page_content)
+                print(f"Page content saved to: {filename}")
+            except Exception as e:
+                print(f"Error saving page content: {e}")
+    
+    return True
+
+def search_frontier_flights(origin, destination, date_str, use_proxy=False, proxy_server=None, driver=None,
+                            pacing=None, timer=None, extract_in_browser=True, save_page=False, fare_type='DD',
+                            lightweight=False, return_date=None, passengers=None, base_url=FRONTIER_BASE_URL,
+                            deadline=None):
     """
     Scrapes Frontier's website using Selenium with stealth mode and detection prevention.
 
@@ -150,9 +574,28 @@ def search_frontier_flights(origin, destination, date_str, use_proxy=False, prox
         date_str (str): The departure date in 'YYYY-MM-DD' format.
         use_proxy (bool): Whether to use the proxy server (default: True).
         proxy_server (str): Specific proxy server to use (format: "host:port").
+        driver: An already-stealthed driver (e.g. leased from a BrowserPool). When given,
+                it is used as-is and left open for the caller; otherwise a new browser
+                is started and closed for this search.
+        pacing (PacingPolicy): Human-like delays to add around the search (default: DEFAULT_PACING;
+                               use PacingPolicy.none() to disable them).
+        timer (PhaseTimer): Collects per-phase durations (default: a new timer, printed at the end).
+        extract_in_browser (bool): Read the fares from the page's JS globals with one execute_script
+                                   call; the full page source is only fetched if that fails.
+        save_page (bool): Archive the Flight/Select HTML to a timestamped .html.gz file
+                          (or, when it holds no flight data, to debug_page_source_*.html.gz).
+        fare_type (str): 'DD' for Discount Den fares, 'STD' for Standard.
+        lightweight (bool): Start the browser with the lightweight scraping profile
+                            (only applies when no ``driver`` is given).
+        return_date (str): Return date in 'YYYY-MM-DD' format for a round trip. Both legs
+                           come from the same Select page; return cells have ``isReturnTrip``.
+        passengers (Passengers): Travellers to price for (default: ONE_ADULT).
+        base_url (str): Scheme and host to search against (e.g. a local stand-in server).
+        deadline (float): time.time() by which the page readiness wait must end.
 
     Returns:
-        A list of fare dictionaries, or None if the request/parsing fails.
+        A list of fare dictionaries (empty when the site reports no flights on this date),
+        or None if the request/parsing fails.
     
     Raises:
         CaptchaDetectedException: When CAPTCHA is detected, to trigger retry with new proxy.
@@ -168,263 +611,50 @@ def search_frontier_flights(origin, destination, date_str, use_proxy=False, prox
     else:
         print("Using direct connection (no proxy)")
 
-    # Configure Chrome options for stealth mode
-    options = Options()
-    # Don't use headless mode to avoid detection
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-web-security")
-    options.add_argument("--disable-features=VizDisplayCompositor")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    
-    # Configure proxy if enabled
-    if use_proxy and proxy_server:
-        # Use the specified proxy server
-        options.add_argument(f"--proxy-server=http://{proxy_server}")
-        print(f"Configured proxy: {proxy_server} (IP authentication)")
-    else:
-        print("Using direct connection (no proxy)")
-    
-    # Add realistic user agent
-    user_agent = random.choice(USER_AGENTS)
-    options.add_argument(f"--user-agent={user_agent}")
-    
-    # Additional stealth options
-    options.add_argument("--disable-background-timer-throttling")
-    options.add_argument("--disable-renderer-backgrounding")
-    options.add_argument("--disable-backgrounding-occluded-windows")
-    options.add_argument("--disable-client-side-phishing-detection")
-    options.add_argument("--disable-default-apps")
-    options.add_argument("--disable-hang-monitor")
-    options.add_argument("--disable-popup-blocking")
-    options.add_argument("--disable-prompt-on-repost")
-    options.add_argument("--disable-sync")
-    options.add_argument("--metrics-recording-only")
-    options.add_argument("--no-first-run")
-    options.add_argument("--safebrowsing-disable-auto-update")
-
-    driver = None
+    pacing = pacing or DEFAULT_PACING
+    timer = timer or PhaseTimer()
+    owns_driver = driver is None
     try:
-        # Initialize the webdriver
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        
-        # Apply stealth settings
-        stealth(driver,
-                languages=["en-US", "en"],
-                vendor="Google Inc.",
-                platform="Win32",
-                webgl_vendor="Intel Inc.",
-                renderer="Intel Iris OpenGL Engine",
-                fix_hairline=True)
-        
-        # Convert date string 'YYYY-MM-DD' to 'Mon DD, YYYY' format
+        # Step 1: Build the search URL before paying for a browser
         try:
-            dt_object = datetime.strptime(date_str, '%Y-%m-%d')
-            formatted_date = dt_object.strftime('%b %d, %Y')  # e.g., 'Jun 16, 2025'
-        except ValueError:
-            print(f"Error: Invalid date format. Please use YYYY-MM-DD.")
+            internal_select_url = build_internal_select_url(origin, destination, date_str, base_url=base_url,
+                                                            fare_type=fare_type, return_date=return_date,
+                                                            passengers=passengers)
+        except ValueError as e:
+            print(f"Error: Invalid search ({e}). Dates must be YYYY-MM-DD.")
             return None
-
-
-        # https://booking.flyfrontier.com/Flight/InternalSelect?o1=JFK&d1=ATL&dd1=Jun%2016,%202025&ADT=1&mon=true&promo=&ftype=DD
-        
-        # Step 2: Navigate to the flight search page with parameters
-        params_internal = {
-            'o1': origin,
-            'd1': destination,
-            'dd1': formatted_date,
-            'ADT': 1,
-            'mon': 'true',
-            'promo': '',
-            'ftype': 'DD'  # DD for Discount Den, use 'STD' for Standard
-        }
-        internal_select_url = f"https://booking.flyfrontier.com/Flight/InternalSelect?{urlencode(params_internal)}"
-        
-        print(f"Step 2: Navigating to search URL and following redirects...")
-        driver.get(internal_select_url)
-        
-        # Wait for redirects to complete and monitor URL changes
-        print("Following redirects...")
-        redirect_count = 0
-        max_redirects = 10
-        target_pattern = "/Flight/Select"
-        
-        start_time = time.time()
-        max_wait_time = 60  # Maximum 60 seconds to wait for final page
-        
-        while redirect_count < max_redirects and (time.time() - start_time) < max_wait_time:
-            current_url = driver.current_url
-            print(f"Current URL: {current_url}")
-            
-            # Check if we've reached the Flight/Select page
-            if target_pattern in current_url:
-                print(f"✅ Successfully reached Flight/Select page after {redirect_count} redirects")
-                print(f"Final URL: {current_url}")
-                
-                # Save the page content when we reach Flight/Select
-                print("💾 Saving Flight/Select page content...")
-                try:
-                    page_content = driver.page_source
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = f"flight_select_page_{timestamp}.html"
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        f.write(page_content)
-                    print(f"Page content saved to: {filename}")
-                except Exception as e:
-                    print(f"Error saving page content: {e}")
-                
-                break
-            
-            # Wait for potential redirect
-            time.sleep(random.uniform(2.0, 4.0))
-            new_url = driver.current_url
-            
-            # If URL changed, we had a redirect
-            if new_url != current_url:
-                redirect_count += 1
-                print(f"Redirect #{redirect_count}: {new_url}")
-            else:
-                # URL hasn't changed, check if we need to wait longer or if redirects are done
-                time.sleep(random.uniform(1.0, 2.0))
-                final_url = driver.current_url
-                if final_url == new_url:
-                    # No more redirects happening
-                    print(f"No more redirects detected. Final URL: {final_url}")
-                    if target_pattern not in final_url:
-                        print(f"⚠️  Warning: Did not reach Flight/Select page. Final URL: {final_url}")
-                    break
-        
-        if redirect_count >= max_redirects:
-            print(f"Warning: Maximum redirects ({max_redirects}) reached")
-        elif (time.time() - start_time) >= max_wait_time:
-            print(f"Warning: Maximum wait time ({max_wait_time}s) reached")
         
-        # Wait for the page to fully load and flight data to be populated
-        print("Step 3: Waiting for flight data to load...")
-        time.sleep(random.uniform(5.0, 8.0))
+        if owns_driver:
+            with timer.phase("driver_start"):
+                driver = create_stealth_driver(proxy_server if use_proxy else None, lightweight=lightweight)
         
-        # Try to wait for specific elements that indicate the page is loaded
-        print("Checking for page content indicators...")
-        content_found = False
-        
-        try:
-            # Wait for flight results, error message, or CAPTCHA to appear
-            # Use a more comprehensive check for various content types
-            def check_page_content(driver):
-                try:
-                    page_source = driver.page_source.lower()
-                    
-                    # Check for flight data
-                    if "var model" in page_source:
-                        print("✓ Found flight data model")
-                        return True
-                    
-                    # Check for no flights message
-                    if any(phrase in page_source for phrase in [
-                        "no direct flights", "no flights available", "no flights found",
-                        "try different dates", "no results found"
-                    ]):
-                        print("✓ Found 'no flights' message")
-                        return True
-                    
-                    # Check for CAPTCHA or security check
-                    if any(phrase in page_source for phrase in [
-                        "captcha", "security check", "verify you are human", 
-                        "prove you are not a robot", "recaptcha"
-                    ]):
-                        print("⚠️  Found CAPTCHA/security check")
-                        return True
-                    
-                    # Check for flight-related content (even if structure is different)
-                    flight_indicators = [
-                        "flight number", "departure time", "arrival time",
-                        "select flight", "book flight", "fare", "price",
-                        "outbound", "return", "passenger", "traveler"
-                    ]
-                    
-                    found_indicators = []
-                    for indicator in flight_indicators:
-                        if indicator in page_source:
-                            found_indicators.append(indicator)
-                    
-                    if len(found_indicators) >= 3:  # Need at least 3 flight-related terms
-                        print(f"✓ Found flight content indicators: {found_indicators[:3]}...")
-                        return True
-                    
-                    return False
-                except:
-                    return False
-            
-            # Wait up to 20 seconds for content to appear
-            WebDriverWait(driver, 20).until(check_page_content)
-            content_found = True
-            print("Page content detected, proceeding with data extraction...")
-            
-        except Exception as e:
-            print(f"Timeout waiting for page content, proceeding anyway: {e}")
-            print("Will attempt to extract data from current page state...")
-        
-        # Additional wait if we didn't find expected content
-        if not content_found:
-            print("Adding extra wait time for page to fully load...")
-            time.sleep(random.uniform(3.0, 6.0))
+        # Step 2: Navigate to the flight search page with parameters
+        if not load_select_page(driver, internal_select_url, date_str, proxy_server=proxy_server,
+                                timer=timer, save_page=save_page, deadline=deadline):
+            return []
         
-        # Add some human-like scrolling while waiting for data to load
-        for _ in range(3):
-            scroll_amount = random.randint(200, 400)
-            driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
-            time.sleep(random.uniform(1.0, 2.0))
+        with timer.phase("pacing"):
+            pacing.after_ready(driver)
         
         # Step 4: Extract flight data from the page
         print("Step 4: Extracting flight data...")
-        page_source = driver.page_source
-        
-        # Look for the flight data script
-        soup = BeautifulSoup(page_source, 'html.parser')
-        data_script = soup.find('script', text=re.compile(r'var\s+model\s*=\s*'))
-        
-        if not data_script:
-            # Check for specific error messages
-            if "no direct flights are available" in page_source.lower():
-                print(f"\nNo flights found for this route on {date_str}.")
-                return None
-            elif "captcha" in page_source.lower() or "security check" in page_source.lower():
-                print(f"\n⚠️  CAPTCHA or security check detected with proxy {proxy_server}!")
-                print("Raising exception to trigger retry with different proxy...")
-                raise CaptchaDetectedException(f"CAPTCHA detected with proxy {proxy_server}")
-            else:
-                print("\nError: Could not find the flight data script in the HTML response.")
-                # Save the page source for debugging
-                with open('debug_page_source.html', 'w') as f:
-                    f.write(page_source)
-                print("Page source saved to debug_page_source.html for analysis.")
-                return None
-
-        # Step 5: Extract and parse the JSON data
-        match = re.search(r'var\s+model\s*=\s*(\{.*?\});', data_script.string, re.DOTALL)
-        if not match:
-            print("Error: Could not extract the JSON data from the script tag.")
-            return None
-
-        json_data_str = match.group(1)
-        flight_data = json.loads(json_data_str)
-        
-        # Step 6: Navigate the dictionary to get the fare cells
-        journeys = flight_data.get('journey', {})
-        if not journeys.get('isSuccess', False):
-            error_message = journeys.get('message', 'No flights found on this date.')
-            print(f"\nFrontier reported an issue: {error_message}")
-            return None
-            
-        fare_tensor = journeys.get('fareTensor', {})
-        fare_cells = fare_tensor.get('cells', [])
-        
-        print(f"Successfully extracted {len(fare_cells)} fare options.")
-        return fare_cells
+        with timer.phase("extract"):
+            if extract_in_browser:
+                extracted = extract_flight_data_in_browser(driver)
+                if extracted is not None:
+                    fare_cells, error_message = fare_cells_from_flight_data(*extracted)
+                    if fare_cells is None:
+                        print(f"\nNo flights for this route on {date_str}: {error_message}")
+                        return []
+                    print(f"Successfully extracted {len(fare_cells)} fare options in-browser.")
+                    return fare_cells
+                print("In-browser extraction found no flight data, falling back to page source...")
+            page_source = driver.page_source
+            timer.count("page_source_bytes", len(page_source))
+            return parse_flight_page(page_source, date_str, proxy_server, save_debug=save_page)
 
+    except CaptchaDetectedException:
+        raise
     except Exception as e:
         error_msg = str(e)
         if use_proxy and ("proxy" in error_msg.lower() or "connection" in error_msg.lower()):
@@ -436,11 +666,39 @@ def search_frontier_flights(origin, destination, date_str, use_proxy=False, prox
             print(f"An error occurred during the browser operation: {e}")
         return None
     finally:
-        if driver:
+        if driver and owns_driver:
             # Keep browser open for a moment in case user needs to see something
-            print("Closing browser in 3 seconds...")
-            time.sleep(3)
-            driver.quit()
+            with timer.phase("close"):
+                pacing.before_close()
+                driver.quit()
+        print(f"⏱️  Phase timings: {timer.summary()}")
+
+def search_round_trip(origin, destination, date_str, return_date, use_proxy=True, max_retries=3, pool=None,
+                      fare_type='DD', proxy_manager=None, passengers=None):
+    """
+    Search both legs of a round trip with one page load.
+
+    Args:
+        origin (str): The 3-letter IATA code for the origin airport.
+        destination (str): The 3-letter IATA code for the destination airport.
+        date_str (str): The outbound date in 'YYYY-MM-DD' format.
+        return_date (str): The return date in 'YYYY-MM-DD' format.
+        passengers (Passengers): Travellers to price for (default: ONE_ADULT).
+        Other arguments are passed to search_frontier_flights_with_retry.
+
+    Returns:
+        A RoundTripFares(outbound, inbound) of fare-cell lists, or None if the search fails.
+    """
+    fares = search_frontier_flights_with_retry(origin, destination, date_str, use_proxy=use_proxy,
+                                               max_retries=max_retries, pool=pool, fare_type=fare_type,
+                                               proxy_manager=proxy_manager, return_date=return_date,
+                                               passengers=passengers)
+    if fares is None:
+        return None
+    outbound, inbound = split_journeys(fares)
+    if not inbound:
+        print(f"⚠️  No return flights {destination}→{origin} on {return_date}")
+    return RoundTripFares(outbound, inbound)
 
 def create_proxy_auth_extension():
     """
@@ -502,40 +760,58 @@ def create_proxy_auth_extension():
     return extension_path
 
 if __name__ == '__main__':
-    # Test proxy connection first
-    print("=== Proxy Connection Test ===")
-    proxy_working = test_proxy_connection()
-    print()
-    
-    if not proxy_working:
-        print("⚠️  Proxy test failed. You can:")
-        print("1. Continue with proxy anyway (might work for actual scraping)")
-        print("2. Continue without proxy")
-        print("3. Exit and check your IP authentication with webshare.io")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Search Frontier fares for one route and date.")
+    parser.add_argument("origin", nargs="?", default="JFK")
+    parser.add_argument("destination", nargs="?", default="ATL")
+    parser.add_argument("date", nargs="?", default="2025-07-15", help="Departure date (YYYY-MM-DD)")
+    parser.add_argument("--no-proxy", action="store_true", help="Connect directly")
+    parser.add_argument("--on-proxy-failure", choices=["proxy", "direct", "exit"], default="proxy",
+                        help="What to do when the proxy test fails (default: keep using the proxy)")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--fare-type", default="DD", choices=["DD", "STD"])
+    parser.add_argument("--return-date", help="Return date (YYYY-MM-DD) for a round trip")
+    parser.add_argument("--adults", type=int, default=1)
+    parser.add_argument("--children", type=int, default=0)
+    parser.add_argument("--infants", type=int, default=0)
+    args = parser.parse_args()
+
+    use_proxy = not args.no_proxy
+    if use_proxy:
+        # Test proxy connection first
+        print("=== Proxy Connection Test ===")
+        proxy_working = test_proxy_connection()
+        print()
         
-        choice = input("\nEnter your choice (1/2/3): ").strip()
-        if choice == '2':
-            use_proxy = False
-            print("Continuing without proxy...")
-        elif choice == '3':
-            print("Exiting. Please check your IP whitelist with webshare.io")
-            exit()
-        else:
-            use_proxy = True
-            print("Continuing with proxy anyway...")
-    else:
-        use_proxy = True
+        if not proxy_working:
+            print(f"⚠️  Proxy test failed (--on-proxy-failure={args.on_proxy_failure})")
+            if args.on_proxy_failure == 'direct':
+                use_proxy = False
+                print("Continuing without proxy...")
+            elif args.on_proxy_failure == 'exit':
+                print("Exiting. Please check your IP whitelist with webshare.io")
+                raise SystemExit(1)
+            else:
+                print("Continuing with proxy anyway...")
     
     print("\n=== Flight Search with Auto-Retry ===")
-    origin_airport = "JFK"
-    destination_airport = "ATL"
-    # Updated to use a current date for testing
-    departure_date = "2025-07-15" 
+    origin_airport = args.origin.upper()
+    destination_airport = args.destination.upper()
+    departure_date = args.date
 
     # Use the new retry wrapper function
-    all_fares = search_frontier_flights_with_retry(origin_airport, destination_airport, departure_date, use_proxy=use_proxy)
+    all_fares = search_frontier_flights_with_retry(origin_airport, destination_airport, departure_date,
+                                                   use_proxy=use_proxy, max_retries=args.max_retries,
+                                                   fare_type=args.fare_type, return_date=args.return_date,
+                                                   passengers=Passengers(args.adults, args.children, args.infants))
 
     if all_fares:
+        # Keep every observation for price tracking
+        history = FareHistory()
+        stored = history.append(fare_records_from_cells(origin_airport, destination_airport, departure_date, all_fares))
+        print(f"\n📈 Recorded {stored} fares in {history.directory}/ ({len(history)} observations total)")
+        
         print("\n--- Available Fares ---")
         for fare in all_fares:
             price = fare.get('priceSpecification', {}).get('totalPrice')
@@ -543,9 +819,13 @@ if __name__ == '__main__':
             fare_brand = fare.get('brandedFareClass', 'N/A')
             is_sold_out = fare.get('isSoldOut', False)
 
+            leg = "Return " if fare.get('isReturnTrip') else ""
+
             if is_sold_out:
-                print(f"- {fare_brand} ({fare_type}): SOLD OUT")
+                print(f"- {leg}{fare_brand} ({fare_type}): SOLD OUT")
             elif price is not None:
-                print(f"- {fare_brand} ({fare_type}): ${price:.2f}")
+                print(f"- {leg}{fare_brand} ({fare_type}): ${price:.2f}")
+    elif all_fares is not None:
+        print(f"\nNo flights from {origin_airport} to {destination_airport} on {departure_date}.")
     else:
         print("\nCould not retrieve flight information after all retry attempts.")
\ No newline at end of file
@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from readiness import PhaseTimer
+
+_sinks = []
+_sinks_lock = threading.Lock()
+
+
+class SearchMetrics(PhaseTimer):
+    """
+    Structured record of one search: a span per phase plus counters and labels.
+
+    It is a PhaseTimer, so it can be passed as ``timer`` to search_frontier_flights
+    and load_select_page; every ``phase()`` also becomes a span with its offset
+    from the start of the search. Counters used by the scraper: page_source_bytes,
+    redirects, pages_loaded, retries, captchas.
+    """
+
+    def __init__(self, origin, destination, date_str, fare_type='DD'):
+        super().__init__()
+        self.labels = {'origin': origin, 'destination': destination, 'date': date_str, 'fare_type': fare_type}
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self.proxy = None
+        self.outcome = None
+        self.total_seconds = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            with super().phase(name):
+                yield
+        finally:
+            self.spans.append({'name': name, 'offset': start - self._t0,
+                               'seconds': time.perf_counter() - start})
+
+    def finish(self, outcome, proxy=None):
+        """Close the record and hand it to every registered sink."""
+        self.outcome = outcome
+        if proxy is not None:
+            self.proxy = proxy
+        self.total_seconds = time.perf_counter() - self._t0
+        emit(self)
+
+    def to_dict(self):
+        return {
+            **self.labels,
+            'started_at': self.started_at,
+            'total_seconds': self.total_seconds,
+            'outcome': self.outcome,
+            'proxy': self.proxy,
+            'phases': dict(self.durations),
+            'spans': list(self.spans),
+            'counters': dict(self.counters),
+        }
+
+
+def add_sink(sink):
+    """Register a sink; it receives every finished SearchMetrics via ``sink.emit(metrics)``."""
+    with _sinks_lock:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def emit(metrics):
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink.emit(metrics)
+        except Exception as e:
+            print(f"⚠️  Metrics sink {type(sink).__name__} failed: {e}")
+
+
+class JsonLinesSink:
+    """Appends one JSON object per search to a file."""
+
+    def __init__(self, path="search_metrics.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, metrics):
+        line = json.dumps(metrics.to_dict(), separators=(',', ':'))
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+
+class PrometheusSink:
+    """
+    Aggregates searches into Prometheus counters and summaries.
+
+    ``render()`` returns the text exposition format; ``serve(port)`` exposes it
+    at http://host:port/metrics for scraping.
+    """
+
+    def __init__(self, prefix="frontier_scraper"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.searches = {}          # outcome -> count
+        self.phase_seconds = {}     # phase -> [sum, count]
+        self.counters = {}          # counter -> total
+        self.proxy_searches = {}    # (proxy, outcome) -> count
+        self.search_seconds = [0.0, 0]
+        self._server = None
+
+    def emit(self, metrics):
+        with self._lock:
+            self.searches[metrics.outcome] = self.searches.get(metrics.outcome, 0) + 1
+            for name, seconds in metrics.durations.items():
+                total = self.phase_seconds.setdefault(name, [0.0, 0])
+                total[0] += seconds
+                total[1] += 1
+            for name, value in metrics.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            key = (metrics.proxy or 'direct', metrics.outcome)
+            self.proxy_searches[key] = self.proxy_searches.get(key, 0) + 1
+            if metrics.total_seconds is not None:
+                self.search_seconds[0] += metrics.total_seconds
+                self.search_seconds[1] += 1
+
+    def render(self):
+        p = self.prefix
+        with self._lock:
+            lines = [f"# TYPE {p}_searches_total counter"]
+            lines += [f'{p}_searches_total{{outcome="{o}"}} {n}' for o, n in sorted(self.searches.items())]
+            lines.append(f"# TYPE {p}_proxy_searches_total counter")
+            lines += [f'{p}_proxy_searches_total{{proxy="{proxy}",outcome="{o}"}} {n}'
+                      for (proxy, o), n in sorted(self.proxy_searches.items())]
+            lines.append(f"# TYPE {p}_search_seconds summary")
+            lines.append(f"{p}_search_seconds_sum {self.search_seconds[0]:.6f}")
+            lines.append(f"{p}_search_seconds_count {self.search_seconds[1]}")
+            lines.append(f"# TYPE {p}_phase_seconds summary")
+            for name, (total, count) in sorted(self.phase_seconds.items()):
+                lines.append(f'{p}_phase_seconds_sum{{phase="{name}"}} {total:.6f}')
+                lines.append(f'{p}_phase_seconds_count{{phase="{name}"}} {count}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {p}_{name}_total counter")
+                lines.append(f"{p}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9108, host="0.0.0.0"):
+        """Expose ``render()`` over HTTP on a background thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = sink.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"📊 Prometheus metrics at http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server
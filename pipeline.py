@@ -0,0 +1,195 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from change_tracker import changed_cells, describe_change
+from extractor import extract_payload, fetch_raw_flight_data
+from fare_store import fare_records_from_cells
+from main import (
+    CaptchaDetectedException,
+    ROTATING_PROXY_ENDPOINT,
+    build_internal_select_url,
+    create_browser_pool,
+    load_select_page,
+)
+from readiness import DEFAULT_PACING
+from scheduler import SearchResult, build_jobs
+
+
+def acquire_payload(pool, job, fare_type='DD', proxy_server=None, pacing=DEFAULT_PACING):
+    """
+    Load one Flight/Select page on a pooled browser and return its raw payload.
+
+    Returns:
+        A (kind, text) payload for extractor.extract_payload, or None when the site
+        reported no flights.
+
+    Raises:
+        CaptchaDetectedException: When the page is a CAPTCHA (the browser is recycled).
+    """
+    url = build_internal_select_url(job.origin, job.destination, job.date, fare_type=fare_type)
+    with pool.lease() as driver:
+        if not load_select_page(driver, url, job.date, proxy_server=proxy_server):
+            return None
+        pacing.after_ready(driver)
+        return fetch_raw_flight_data(driver)
+
+
+def history_persister(history):
+    """Build a persist callback that appends each result's fares to a FareHistory."""
+    def persist(result):
+        job = result.job
+        history.append(fare_records_from_cells(job.origin, job.destination, job.date, result.fares))
+    return persist
+
+
+def change_persister(tracker, history=None, fare_type='DD'):
+    """
+    Build a persist callback that only passes on what changed since the last search.
+
+    Unchanged results just bump the tracker's counter; otherwise the diff is
+    printed and, when ``history`` is given, only the changed fares are appended.
+    """
+    def persist(result):
+        job = result.job
+        observation = tracker.observe(job.origin, job.destination, job.date, result.fares, fare_type=fare_type)
+        if observation.unchanged:
+            return
+        cells = result.fares if observation.first_seen else changed_cells(result.fares, observation.changes)
+        for change in observation.changes:
+            print(f"📈 {job.origin}→{job.destination} {job.date}: {describe_change(change)}")
+        if history is not None and cells:
+            history.append(fare_records_from_cells(job.origin, job.destination, job.date, cells))
+    return persist
+
+
+def gowild_index_persister(index):
+    """Build a persist callback that adds each result's GoWild seats to a GoWildIndex."""
+    def persist(result):
+        job = result.job
+        index.add_search(job.origin, job.destination, job.date, result.fares)
+    return persist
+
+
+async def stream_searches(routes, dates, acquire_concurrency=2, extract_workers=2, persist_concurrency=1,
+                          queue_size=8, use_proxy=True, max_retries=3, fare_type='DD', pool=None,
+                          persist=None, acquire_fn=None):
+    """
+    Search many routes/dates as a pipeline of independent, bounded stages.
+
+    Page acquisition (browsers, in threads), payload extraction (in a process pool)
+    and persistence (in threads) each run at their own concurrency. Bounded queues
+    between them apply backpressure, so a slow disk pauses extraction and, in turn,
+    new navigations instead of piling up pages in memory.
+
+    Args:
+        routes (list): (origin, destination) pairs of IATA codes.
+        dates (list): Departure dates in 'YYYY-MM-DD' format.
+        acquire_concurrency (int): Browsers loading pages at once.
+        extract_workers (int): Processes parsing payloads (0 parses on the event loop's thread pool).
+        persist_concurrency (int): Threads running ``persist`` at once; above 1, ``persist`` must be
+                                   thread-safe (the persisters in this module are).
+        queue_size (int): Capacity of each inter-stage queue.
+        use_proxy (bool): Whether to use the rotating proxy endpoint.
+        max_retries (int): Acquisition attempts per job; CAPTCHAs retry on a fresh browser.
+        fare_type (str): 'DD' for Discount Den fares, 'STD' for Standard.
+        pool (BrowserPool): Pool to lease browsers from (default: a new pool of ``acquire_concurrency``).
+        persist (callable): Called with each successful SearchResult (e.g. history_persister(history)).
+        acquire_fn (callable): Override for acquisition, called as ``acquire_fn(job)`` and returning
+                               a (kind, text) payload or None.
+
+    Yields:
+        SearchResult tuples as soon as each job has been extracted and persisted.
+    """
+    jobs = build_jobs(routes, dates)
+    if not jobs:
+        return
+
+    proxy_server = ROTATING_PROXY_ENDPOINT if use_proxy else None
+    owns_pool = pool is None and acquire_fn is None
+    if owns_pool:
+        pool = create_browser_pool(size=acquire_concurrency, use_proxy=use_proxy)
+    if acquire_fn is None:
+        def acquire_fn(job):
+            return acquire_payload(pool, job, fare_type=fare_type, proxy_server=proxy_server)
+
+    loop = asyncio.get_running_loop()
+    acquire_executor = ThreadPoolExecutor(max_workers=acquire_concurrency, thread_name_prefix="acquire")
+    persist_executor = ThreadPoolExecutor(max_workers=persist_concurrency, thread_name_prefix="persist")
+    extract_executor = ProcessPoolExecutor(max_workers=extract_workers) if extract_workers > 0 else None
+
+    job_queue = asyncio.Queue()
+    for job in jobs:
+        job_queue.put_nowait(job)
+    page_queue = asyncio.Queue(maxsize=queue_size)
+    extracted_queue = asyncio.Queue(maxsize=queue_size)
+    out_queue = asyncio.Queue(maxsize=queue_size)
+
+    async def acquire_worker():
+        while True:
+            try:
+                job = job_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.time()
+            payload, error = None, None
+            for attempt in range(max_retries):
+                try:
+                    payload = await loop.run_in_executor(acquire_executor, acquire_fn, job)
+                    error = None
+                    break
+                except CaptchaDetectedException as e:
+                    error = e
+                    print(f"🚫 CAPTCHA on {job.origin}→{job.destination} {job.date} "
+                          f"(attempt {attempt + 1}/{max_retries})")
+                    if attempt < max_retries - 1:
+                        await asyncio.sleep(random.uniform(2.0, 5.0) * (attempt + 1))
+                except Exception as e:
+                    error = e
+                    break
+            await page_queue.put((job, payload, error, start))
+
+    async def extract_worker():
+        while True:
+            job, payload, error, start = await page_queue.get()
+            fares = None
+            if payload is not None and error is None:
+                try:
+                    fares, message = await loop.run_in_executor(extract_executor, extract_payload, *payload)
+                    if fares is None:
+                        print(f"ℹ️  {job.origin}→{job.destination} {job.date}: {message}")
+                except Exception as e:
+                    error = e
+            await extracted_queue.put(SearchResult(job, fares, error, time.time() - start))
+
+    async def persist_worker():
+        while True:
+            result = await extracted_queue.get()
+            if persist is not None and result.fares:
+                try:
+                    await loop.run_in_executor(persist_executor, persist, result)
+                except Exception as e:
+                    print(f"⚠️  Persisting {result.job} failed: {e}")
+            await out_queue.put(result)
+
+    tasks = [asyncio.create_task(acquire_worker()) for _ in range(acquire_concurrency)]
+    tasks += [asyncio.create_task(extract_worker()) for _ in range(max(1, extract_workers))]
+    tasks += [asyncio.create_task(persist_worker()) for _ in range(persist_concurrency)]
+
+    print(f"🚰 Streaming {len(jobs)} searches: {acquire_concurrency} browsers, "
+          f"{extract_workers} extract processes, {persist_concurrency} writers")
+    try:
+        # Every job passes through every stage exactly once, errors included
+        for _ in range(len(jobs)):
+            yield await out_queue.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        acquire_executor.shutdown(wait=False, cancel_futures=True)
+        persist_executor.shutdown(wait=True)
+        if extract_executor is not None:
+            extract_executor.shutdown(wait=False, cancel_futures=True)
+        if owns_pool:
+            pool.close()
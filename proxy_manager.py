@@ -0,0 +1,221 @@
+import random
+import threading
+import time
+from collections import deque
+
+# Lightweight endpoint that echoes the caller's IP
+PROBE_URL = "http://httpbin.org/ip"
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+
+
+def probe_proxy(proxy_server, url=PROBE_URL, timeout=10):
+    """
+    Check a proxy with one plain HTTP request instead of a browser.
+
+    Args:
+        proxy_server (str): Proxy to test (format: "host:port").
+        url (str): URL to fetch through the proxy; should return JSON with an ``origin`` field.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        A (ok, latency_seconds, ip_or_error) tuple.
+    """
+    import requests  # deferred so importing main stays cheap
+
+    proxy_url = f"http://{proxy_server}"
+    start = time.time()
+    try:
+        response = requests.get(url, proxies={"http": proxy_url, "https": proxy_url}, timeout=timeout)
+        response.raise_for_status()
+        return True, time.time() - start, response.json().get('origin')
+    except Exception as e:
+        return False, time.time() - start, str(e)
+
+
+class ProxyEndpoint:
+    """Sliding-window health stats and circuit breaker state for one proxy."""
+
+    def __init__(self, address, window_size=50, window_seconds=900):
+        self.address = address
+        self.window_seconds = window_seconds
+        self.outcomes = deque(maxlen=window_size)  # (timestamp, ok, latency, captcha)
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.open_seconds = 0.0
+        self.trial_in_flight = False
+
+    def recent(self, now=None):
+        cutoff = (now or time.time()) - self.window_seconds
+        return [o for o in self.outcomes if o[0] >= cutoff]
+
+    def stats(self, now=None):
+        """Success rate, CAPTCHA rate and mean latency over the window (Laplace-smoothed rates)."""
+        recent = self.recent(now)
+        n = len(recent)
+        successes = sum(1 for o in recent if o[1])
+        captchas = sum(1 for o in recent if o[3])
+        latencies = [o[2] for o in recent if o[1]]
+        return {
+            'samples': n,
+            'success_rate': (successes + 1) / (n + 2),
+            'captcha_rate': captchas / n if n else 0.0,
+            'latency': sum(latencies) / len(latencies) if latencies else None,
+            'state': self.state,
+        }
+
+    def score(self, now=None):
+        stats = self.stats(now)
+        latency = stats['latency'] if stats['latency'] is not None else 5.0
+        return stats['success_rate'] * (1.0 - stats['captcha_rate']) / (1.0 + latency / 10.0)
+
+
+class ProxyManager:
+    """
+    Routes searches to the healthiest proxy endpoint and remembers what worked.
+
+    Each endpoint keeps a sliding window of outcomes (success, latency, CAPTCHA).
+    Endpoints that fail ``failure_threshold`` times in a row trip a circuit
+    breaker and are skipped for ``open_seconds`` (doubling on repeated trips),
+    then get a single half-open trial. Sticky sessions keep one key (e.g. a
+    route) on the same endpoint until it fails or hits a CAPTCHA there.
+    """
+
+    def __init__(self, endpoints, window_size=50, window_seconds=900, failure_threshold=3,
+                 open_seconds=60, max_open_seconds=900, sticky_seconds=600):
+        """
+        Args:
+            endpoints (list): Proxy addresses ("host:port").
+            window_size (int): Outcomes remembered per endpoint.
+            window_seconds (float): Only outcomes this recent count towards health.
+            failure_threshold (int): Consecutive failures that open the circuit.
+            open_seconds (float): Initial time an open circuit stays open.
+            max_open_seconds (float): Cap on the (doubling) open time.
+            sticky_seconds (float): How long a session key stays pinned to its endpoint.
+        """
+        if not endpoints:
+            raise ValueError("ProxyManager needs at least one endpoint")
+        self.endpoints = {address: ProxyEndpoint(address, window_size, window_seconds)
+                          for address in endpoints}
+        self.failure_threshold = failure_threshold
+        self.initial_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.sticky_seconds = sticky_seconds
+        self._sticky = {}
+        self._avoid = {}  # session key -> endpoint it just failed on
+        self._lock = threading.Lock()
+
+    def _available(self, endpoint, now):
+        if endpoint.state == CIRCUIT_OPEN and now >= endpoint.open_until:
+            endpoint.state = CIRCUIT_HALF_OPEN
+            endpoint.trial_in_flight = False
+        if endpoint.state == CIRCUIT_OPEN:
+            return False
+        if endpoint.state == CIRCUIT_HALF_OPEN:
+            return not endpoint.trial_in_flight
+        return True
+
+    def choose(self, session_key=None):
+        """
+        Pick the endpoint for the next attempt.
+
+        Args:
+            session_key (str): Optional key (e.g. 'JFK-ATL') to keep on the same endpoint.
+
+        Returns:
+            A proxy address, or None when every circuit is open.
+        """
+        now = time.time()
+        with self._lock:
+            if session_key is not None:
+                pinned = self._sticky.get(session_key)
+                if pinned and pinned[1] > now:
+                    endpoint = self.endpoints[pinned[0]]
+                    if endpoint.state == CIRCUIT_CLOSED:
+                        return endpoint.address
+
+            candidates = [e for e in self.endpoints.values() if self._available(e, now)]
+            if not candidates:
+                return None
+            avoid = self._avoid.pop(session_key, None) if session_key is not None else None
+            if avoid is not None and len(candidates) > 1:
+                candidates = [e for e in candidates if e.address != avoid]
+            best = max(candidates, key=lambda e: (e.score(now), random.random()))
+            if best.state == CIRCUIT_HALF_OPEN:
+                best.trial_in_flight = True
+            if session_key is not None:
+                self._sticky[session_key] = (best.address, now + self.sticky_seconds)
+            return best.address
+
+    def record(self, address, ok, latency, captcha=False):
+        """
+        Report the outcome of an attempt through ``address``.
+
+        Args:
+            ok (bool): Whether the proxy delivered the page; a genuine "no flights" page counts as ok.
+            latency (float): Seconds the attempt took.
+            captcha (bool): Whether the attempt hit a CAPTCHA / block page.
+        """
+        now = time.time()
+        with self._lock:
+            endpoint = self.endpoints.get(address)
+            if endpoint is None:
+                return
+            endpoint.outcomes.append((now, ok, latency, captcha))
+            if ok:
+                endpoint.consecutive_failures = 0
+                endpoint.state = CIRCUIT_CLOSED
+                endpoint.open_seconds = 0.0
+                endpoint.trial_in_flight = False
+                return
+
+            # A blocked or failing endpoint should not get the retry: move every key pinned to it
+            for key, (pinned, _) in list(self._sticky.items()):
+                if pinned == address:
+                    del self._sticky[key]
+                    self._avoid[key] = address
+            endpoint.consecutive_failures += 1
+            if endpoint.state == CIRCUIT_HALF_OPEN or endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.open_seconds = min(self.max_open_seconds,
+                                            max(self.initial_open_seconds, endpoint.open_seconds * 2))
+                endpoint.state = CIRCUIT_OPEN
+                endpoint.open_until = now + endpoint.open_seconds
+                endpoint.trial_in_flight = False
+                print(f"🔌 Circuit open for {address} for {endpoint.open_seconds:.0f}s")
+
+    def backoff(self, attempt, base=2.0, cap=60.0):
+        """Seconds to wait before retry ``attempt`` (0-based): exponential with full jitter."""
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    def seconds_until_available(self):
+        """How long until some open circuit goes half-open (0 if one is usable now)."""
+        now = time.time()
+        with self._lock:
+            if any(self._available(e, now) for e in self.endpoints.values()):
+                return 0.0
+            return max(0.0, min(e.open_until for e in self.endpoints.values()) - now)
+
+    def health_check(self, url=PROBE_URL, timeout=10):
+        """
+        Probe every endpoint with a light HTTP request and record the results.
+
+        Returns:
+            A dict mapping address to (ok, latency, ip_or_error).
+        """
+        results = {}
+        for address in self.endpoints:
+            ok, latency, detail = probe_proxy(address, url=url, timeout=timeout)
+            self.record(address, ok, latency)
+            results[address] = (ok, latency, detail)
+            print(f"{'✓' if ok else '✗'} {address}: {detail} ({latency:.2f}s)")
+        return results
+
+    def report(self):
+        """Per-endpoint stats, healthiest first."""
+        now = time.time()
+        with self._lock:
+            rows = [(e.address, e.score(now), e.stats(now)) for e in self.endpoints.values()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
@@ -0,0 +1,189 @@
+import random
+import time
+from contextlib import contextmanager
+
+from block_classifier import BLOCK_SCAN_PREFIX, classify_block
+
+# One round trip tells us where the page is and which outcome (if any) has arrived.
+# The fare data lives in the `FlightData` global (older pages: `var model`).
+READINESS_PROBE_JS = """
+var result = {url: location.href, title: document.title, state: document.readyState,
+              data: false, noFlights: false, captcha: false};
+result.data = typeof window.FlightData === 'string' && window.FlightData.length > 0
+    || (typeof window.model === 'object' && window.model !== null);
+if (!result.data) {
+    result.captcha = !!document.querySelector(arguments[0]);
+    if (!result.captcha && result.state !== 'loading' && document.body) {
+        // innerText skips hidden nodes: every Select page ships a hidden "no flights" template
+        var text = (document.body.innerText || '').toLowerCase();
+        result.noFlights = arguments[1].some(function (p) { return text.indexOf(p) !== -1; });
+    }
+}
+return result;
+"""
+
+# Start of the current document, for the block-page classifier
+PAGE_PREFIX_JS = """
+return document.documentElement ? document.documentElement.outerHTML.substring(0, arguments[0]) : '';
+"""
+
+CAPTCHA_SELECTOR = ", ".join([
+    "#px-captcha",
+    "iframe[src*='captcha']",
+    ".g-recaptcha",
+    "#challenge-form",
+    "iframe[title*='challenge']",
+])
+
+NO_FLIGHTS_PHRASES = [
+    "no direct flights", "no flights available", "no flights found",
+    "try different dates", "no results found",
+]
+
+# Outcomes returned by wait_for_page_ready
+READY_DATA = "data"
+READY_NO_FLIGHTS = "no_flights"
+READY_CAPTCHA = "captcha"
+READY_TIMEOUT = "timeout"
+
+
+class PhaseTimer:
+    """Records how long each named phase of a search took, plus simple counters."""
+
+    def __init__(self):
+        self.durations = {}
+        self.counters = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self):
+        """One-line human readable breakdown, e.g. 'navigate 1.20s | readiness 3.41s'."""
+        return " | ".join(f"{name} {seconds:.2f}s" for name, seconds in self.durations.items())
+
+
+class PacingPolicy:
+    """
+    Human-like jitter, kept separate from readiness so it can be tuned or turned off.
+
+    Args:
+        settle (tuple): (min, max) seconds to linger once the page is ready.
+        scroll_passes (int): Number of scroll gestures after the page is ready.
+        scroll_pause (tuple): (min, max) seconds between scroll gestures.
+        scroll_amount (tuple): (min, max) pixels per scroll gesture.
+        close_delay (float): Seconds to keep a self-started browser open before quitting.
+    """
+
+    def __init__(self, settle=(0.5, 1.5), scroll_passes=2, scroll_pause=(0.3, 0.8),
+                 scroll_amount=(200, 400), close_delay=3.0):
+        self.settle = settle
+        self.scroll_passes = scroll_passes
+        self.scroll_pause = scroll_pause
+        self.scroll_amount = scroll_amount
+        self.close_delay = close_delay
+
+    @classmethod
+    def none(cls):
+        """No artificial delays at all (benchmarks, stand-in servers, HTTP fast paths)."""
+        return cls(settle=(0, 0), scroll_passes=0, scroll_pause=(0, 0), close_delay=0)
+
+    def pause(self, bounds):
+        low, high = bounds
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+    def after_ready(self, driver):
+        """Linger and scroll a little, like a person glancing over the results."""
+        self.pause(self.settle)
+        for _ in range(self.scroll_passes):
+            scroll_amount = random.randint(*self.scroll_amount)
+            driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
+            self.pause(self.scroll_pause)
+
+    def before_close(self):
+        if self.close_delay > 0:
+            print(f"Closing browser in {self.close_delay:g} seconds...")
+            time.sleep(self.close_delay)
+
+
+DEFAULT_PACING = PacingPolicy()
+
+
+def probe_page(driver):
+    """Run the readiness probe once and return its result dict."""
+    return driver.execute_script(READINESS_PROBE_JS, CAPTCHA_SELECTOR, NO_FLIGHTS_PHRASES)
+
+
+def wait_for_page_ready(driver, target_pattern="/Flight/Select", timeout=60, poll_interval=0.25):
+    """
+    Wait until the search page shows fare data, a no-flights notice or a CAPTCHA.
+
+    Returns as soon as one signal fires instead of sleeping for fixed periods.
+    Fare data only counts once the URL has reached ``target_pattern``, so the
+    interstitial pages of the redirect chain are skipped. Every probe checks the
+    URL and title against the block-page classifier, and each new document in
+    the chain has its first BLOCK_SCAN_PREFIX characters classified once it has
+    parsed, so a block page ends the wait right after the redirect that led to it.
+
+    Args:
+        driver: The webdriver that navigated to InternalSelect.
+        target_pattern (str): URL fragment of the final results page.
+        timeout (float): Maximum seconds to wait.
+        poll_interval (float): Seconds between probes.
+
+    Returns:
+        A (outcome, info) tuple where outcome is one of READY_DATA, READY_NO_FLIGHTS,
+        READY_CAPTCHA or READY_TIMEOUT, and info is a dict with the final ``url``,
+        ``title``, the number of ``redirects`` observed and, for READY_CAPTCHA,
+        the ``block_reason``.
+    """
+    deadline = time.time() + timeout
+    seen_urls = []
+    scanned = set()
+    info = {"url": None, "title": None, "redirects": 0, "block_reason": None}
+
+    while True:
+        try:
+            state = probe_page(driver)
+        except Exception:
+            # The page is mid-navigation; the next probe will see the new document
+            state = None
+
+        if state:
+            url = state.get("url")
+            if url and (not seen_urls or seen_urls[-1] != url):
+                seen_urls.append(url)
+                print(f"Current URL: {url}")
+            info.update(url=url, title=state.get("title"), redirects=max(0, len(seen_urls) - 1))
+
+            reason = classify_block(url=url, title=state.get("title"))
+            document_key = (url, state.get("state"))
+            if (reason is None and not state.get("data") and state.get("state") != "loading"
+                    and document_key not in scanned):
+                scanned.add(document_key)
+                try:
+                    reason = classify_block(driver.execute_script(PAGE_PREFIX_JS, BLOCK_SCAN_PREFIX))
+                except Exception:
+                    reason = None
+            if reason is None and state.get("captcha"):
+                reason = "captcha element"
+            if reason:
+                info["block_reason"] = reason
+                return READY_CAPTCHA, info
+            if url and target_pattern in url:
+                if state.get("data"):
+                    return READY_DATA, info
+                if state.get("noFlights"):
+                    return READY_NO_FLIGHTS, info
+
+        if time.time() >= deadline:
+            return READY_TIMEOUT, info
+        time.sleep(poll_interval)
@@ -0,0 +1,138 @@
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from main import create_browser_pool, search_frontier_flights_with_retry
+
+# One (origin, destination, date) search and its outcome
+SearchJob = namedtuple('SearchJob', ['origin', 'destination', 'date'])
+SearchResult = namedtuple('SearchResult', ['job', 'fares', 'error', 'elapsed'])
+
+
+def build_jobs(routes, dates):
+    """
+    Expand routes and dates into a list of SearchJob tuples.
+
+    Args:
+        routes (list): (origin, destination) pairs of IATA codes.
+        dates (list): Departure dates in 'YYYY-MM-DD' format.
+
+    Returns:
+        A list of SearchJob, date-major so early dates across all routes go first.
+    """
+    return [SearchJob(origin, destination, date_str)
+            for date_str in dates
+            for origin, destination in routes]
+
+
+def search_many(routes, dates, concurrency=4, job_timeout=180, use_proxy=True,
+                max_retries=3, pool=None, search_fn=None, fare_type='DD'):
+    """
+    Run many route/date searches across a bounded set of browser sessions.
+
+    Results are yielded as jobs complete, so one slow route does not hold back
+    the others. Each job goes through search_frontier_flights_with_retry, so a
+    CAPTCHA still triggers a retry on a fresh IP (and a fresh pooled browser).
+
+    Args:
+        routes (list): (origin, destination) pairs of IATA codes.
+        dates (list): Departure dates in 'YYYY-MM-DD' format.
+        concurrency (int): Number of searches (and browsers) running at once.
+        job_timeout (float): Seconds a single job may run. The default search stops retrying and
+                             cuts its readiness wait at the deadline; a job still running then
+                             is reported as timed out and its pooled browser is quit.
+        use_proxy (bool): Whether to use the rotating proxy endpoint.
+        max_retries (int): Retry budget per job.
+        pool (BrowserPool): Pool to lease browsers from (default: a new pool of ``concurrency`` browsers).
+        search_fn (callable): Override for the per-job search, called as
+                              ``search_fn(origin, destination, date_str)``; on timeout only its
+                              leases from ``pool`` can be aborted.
+        fare_type (str): 'DD' for Discount Den fares, 'STD' for Standard.
+
+    Yields:
+        SearchResult tuples in completion order. ``error`` is set (and ``fares`` is None)
+        when the job raised or exceeded ``job_timeout``.
+
+    Note:
+        Quitting a timed-out job's browser makes its in-flight command fail, so the
+        worker thread and pool slot come back within seconds instead of blocking
+        the next jobs for the rest of a slow navigation.
+    """
+    jobs = build_jobs(routes, dates)
+    if not jobs:
+        return
+
+    owns_pool = pool is None and search_fn is None
+    if owns_pool:
+        pool = create_browser_pool(size=concurrency, use_proxy=use_proxy)
+
+    takes_deadline = search_fn is None
+    if search_fn is None:
+        def search_fn(origin, destination, date_str, deadline=None):
+            return search_frontier_flights_with_retry(origin, destination, date_str,
+                                                      use_proxy=use_proxy, max_retries=max_retries,
+                                                      pool=pool, fare_type=fare_type, deadline=deadline)
+
+    started = {}
+    threads = {}
+    started_lock = threading.Lock()
+
+    def run(job):
+        start = time.time()
+        with started_lock:
+            started[job] = start
+            threads[job] = threading.get_ident()
+        try:
+            if takes_deadline and job_timeout is not None:
+                return search_fn(job.origin, job.destination, job.date, deadline=start + job_timeout)
+            return search_fn(job.origin, job.destination, job.date)
+        finally:
+            with started_lock:
+                threads.pop(job, None)
+
+    print(f"📋 Scheduling {len(jobs)} searches with concurrency {concurrency}")
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        pending = {executor.submit(run, job): job for job in jobs}
+        while pending:
+            # Wake up in time to expire the oldest running job
+            now = time.time()
+            with started_lock:
+                running = [started[job] for job in pending.values() if job in started]
+            timeout = None
+            if job_timeout is not None and running:
+                timeout = max(0.0, min(running) + job_timeout - now)
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                job = pending.pop(future)
+                elapsed = time.time() - started.get(job, time.time())
+                try:
+                    yield SearchResult(job, future.result(), None, elapsed)
+                except Exception as e:
+                    yield SearchResult(job, None, e, elapsed)
+
+            if job_timeout is None:
+                continue
+            now = time.time()
+            for future, job in list(pending.items()):
+                with started_lock:
+                    start = started.get(job)
+                if start is not None and now - start >= job_timeout:
+                    pending.pop(future)
+                    future.cancel()
+                    print(f"⏱️  {job.origin}→{job.destination} on {job.date} timed out after {job_timeout}s")
+                    # Look up and abort under the lock run() needs to release the job: the
+                    # thread cannot move on to another job (and lease another browser) meanwhile
+                    with started_lock:
+                        thread_id = threads.get(job)
+                        aborted = pool is not None and thread_id is not None and pool.abort(thread_id)
+                    if aborted:
+                        print(f"♻️  Quit the browser of {job.origin}→{job.destination} on {job.date}")
+                    yield SearchResult(job, None, TimeoutError(f"Search exceeded {job_timeout}s"), now - start)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if owns_pool:
+            pool.close()
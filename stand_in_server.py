@@ -0,0 +1,153 @@
+"""
+Local stand-in for booking.flyfrontier.com that serves saved Flight/Select pages.
+
+    python stand_in_server.py flight_select_page_20250615_144220.html --port 8765
+
+Point HttpSearchSession / HybridSearcher at it with base_url="http://127.0.0.1:8765".
+start_stand_in_proxy() provides fake proxy endpoints for ProxyManager.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SESSION_COOKIE = "dotrez"
+BLOCK_PAGE = (b"<html><head><title>Access to this page has been denied</title></head>"
+              b"<body><div id=\"px-captcha\"></div>Please verify you are human</body></html>")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """InternalSelect sets a session cookie and redirects; Select serves the fixture."""
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        server.request_log.append(parts.path)
+
+        if server.block_requests:
+            self._send(403, BLOCK_PAGE)
+        elif parts.path == "/Flight/InternalSelect":
+            session_id = uuid.uuid4().hex
+            server.sessions.add(session_id)
+            self.send_response(302)
+            self.send_header("Location", f"/Flight/Select?{parts.query}")
+            self.send_header("Set-Cookie", f"{SESSION_COOKIE}={session_id}; Path=/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif parts.path == "/Flight/Select":
+            if server.require_session and self._session_id() not in server.sessions:
+                self.send_response(302)
+                self.send_header("Location", "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self._send(200, server.page_bytes)
+        else:
+            self._send(200, b"<html><body>Home</body></html>")
+
+    def _session_id(self):
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                return value
+        return None
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_server(fixture_path, host="127.0.0.1", port=0, require_session=True):
+    """
+    Serve a saved Flight/Select page behind the InternalSelect redirect on a background thread.
+
+    Args:
+        fixture_path (str): Path to a saved Flight/Select HTML page.
+        host (str): Interface to bind.
+        port (int): Port to bind (0 picks a free port).
+        require_session (bool): Redirect Select requests that lack the InternalSelect cookie.
+
+    Returns:
+        A (server, base_url) tuple. Set ``server.block_requests = True`` to answer
+        every request with a CAPTCHA page; call ``server.shutdown()`` when done.
+    """
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    with open(fixture_path, 'rb') as f:
+        server.page_bytes = f.read()
+    server.require_session = require_session
+    server.block_requests = False
+    server.sessions = set()
+    server.request_log = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+class StandInProxyHandler(BaseHTTPRequestHandler):
+    """Plain-HTTP forward proxy stand-in: answers every request itself, like httpbin's /ip."""
+
+    def do_GET(self):
+        server = self.server
+        server.request_log.append(self.path)
+        if server.delay:
+            time.sleep(server.delay)
+        if server.fail:
+            self.send_response(502)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"origin": server.exit_ip}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_proxy(exit_ip="203.0.113.10", delay=0.0, fail=False, host="127.0.0.1", port=0):
+    """
+    Start a fake proxy for exercising ProxyManager without the network.
+
+    Args:
+        exit_ip (str): IP reported back as the proxy's exit address.
+        delay (float): Seconds to stall each request (simulates a slow endpoint).
+        fail (bool): Answer every request with 502 (simulates a dead endpoint).
+
+    Returns:
+        A (server, "host:port") tuple; ``delay`` and ``fail`` can be changed on the server later.
+    """
+    server = ThreadingHTTPServer((host, port), StandInProxyHandler)
+    server.exit_ip = exit_ip
+    server.delay = delay
+    server.fail = fail
+    server.request_log = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a saved Flight/Select page locally.")
+    parser.add_argument("fixture", help="Saved Flight/Select HTML page")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server, base_url = start_stand_in_server(args.fixture, host=args.host, port=args.port)
+    print(f"Serving {args.fixture} at {base_url}/Flight/InternalSelect (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
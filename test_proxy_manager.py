@@ -0,0 +1,163 @@
+import time
+
+import pytest
+
+import main
+from proxy_manager import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, ProxyManager, probe_proxy
+from stand_in_server import start_stand_in_proxy
+
+pytest.importorskip("requests")
+
+
+@pytest.fixture(scope="module")
+def stand_in_proxies():
+    servers = {}
+    for i in range(3):
+        server, address = start_stand_in_proxy(exit_ip=f"203.0.113.{i + 1}")
+        servers[address] = server
+    yield servers
+    for server in servers.values():
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def proxies(stand_in_proxies):
+    """Three healthy stand-in proxies, as {address: server}."""
+    for server in stand_in_proxies.values():
+        server.delay, server.fail = 0.0, False
+        server.request_log.clear()
+    return stand_in_proxies
+
+
+def attempt(manager, session_key="JFK-ATL"):
+    """Choose an endpoint, probe it and record the outcome, as one search attempt would."""
+    address = manager.choose(session_key=session_key)
+    if address is not None:
+        ok, latency, _ = probe_proxy(address, url="http://example.test/ip", timeout=5)
+        manager.record(address, ok, latency)
+    return address
+
+
+def test_probe_reports_exit_ip(proxies):
+    address, server = next(iter(proxies.items()))
+    ok, _, ip = probe_proxy(address, url="http://example.test/ip", timeout=5)
+    assert ok and ip == server.exit_ip
+    server.fail = True
+    assert not probe_proxy(address, url="http://example.test/ip", timeout=5)[0]
+
+
+def test_sticky_session_stays_while_healthy(proxies):
+    manager = ProxyManager(list(proxies))
+    first = attempt(manager)
+    assert [attempt(manager) for _ in range(5)] == [first] * 5
+    assert len(proxies[first].request_log) == 6
+
+
+def test_failure_rotates_sticky_session(proxies):
+    manager = ProxyManager(list(proxies))
+    first = attempt(manager)
+    proxies[first].fail = True
+    assert attempt(manager) == first  # still pinned; this attempt fails
+    assert attempt(manager) != first
+
+
+def test_captcha_rotates_sticky_session(proxies):
+    manager = ProxyManager(list(proxies))
+    used = []
+    for _ in range(3):
+        address = manager.choose(session_key="JFK-ATL")
+        manager.record(address, False, 1.0, captcha=True)
+        used.append(address)
+    assert sorted(used) == sorted(proxies)
+
+
+def test_circuit_opens_then_half_opens(proxies):
+    address = next(iter(proxies))
+    proxies[address].fail = True
+    manager = ProxyManager([address], failure_threshold=2, open_seconds=0.2)
+
+    attempt(manager)
+    assert manager.endpoints[address].state == CIRCUIT_CLOSED
+    attempt(manager)
+    assert manager.endpoints[address].state == CIRCUIT_OPEN
+    assert manager.choose() is None
+    assert 0 < manager.seconds_until_available() <= 0.2
+
+    time.sleep(0.25)
+    assert manager.choose() == address
+    assert manager.endpoints[address].state == CIRCUIT_HALF_OPEN
+    assert manager.choose() is None  # only one trial at a time
+
+    # A failed trial reopens the circuit for twice as long
+    manager.record(address, False, 1.0)
+    assert manager.endpoints[address].state == CIRCUIT_OPEN
+    assert manager.endpoints[address].open_seconds == pytest.approx(0.4)
+
+
+def test_recovered_endpoint_closes_circuit(proxies):
+    address = next(iter(proxies))
+    proxies[address].fail = True
+    manager = ProxyManager([address], failure_threshold=1, open_seconds=0.1)
+    manager.health_check(url="http://example.test/ip", timeout=5)
+    assert manager.endpoints[address].state == CIRCUIT_OPEN
+
+    proxies[address].fail = False
+    time.sleep(0.15)
+    assert attempt(manager) == address
+    endpoint = manager.endpoints[address]
+    assert (endpoint.state, endpoint.consecutive_failures, endpoint.open_seconds) == (CIRCUIT_CLOSED, 0, 0.0)
+
+
+def test_healthiest_endpoint_preferred(proxies):
+    slow, dead, fast = list(proxies)
+    proxies[slow].delay = 0.3
+    proxies[dead].fail = True
+    manager = ProxyManager(list(proxies))
+    manager.health_check(url="http://example.test/ip", timeout=5)
+    assert manager.choose() == fast
+    assert [row[0] for row in manager.report()] == [fast, slow, dead]
+
+
+def test_no_flights_does_not_count_against_proxy(proxies, monkeypatch):
+    calls = []
+
+    def no_flights(origin, destination, date_str, timer=None, **kwargs):
+        calls.append(destination)
+        timer.count("pages_loaded")
+        return []
+
+    monkeypatch.setattr(main, "search_frontier_flights", no_flights)
+    manager = ProxyManager(list(proxies), failure_threshold=2)
+    for destination in ("ATL", "MCO"):
+        assert main.search_frontier_flights_with_retry("JFK", destination, "2030-01-01", max_retries=2,
+                                                       proxy_manager=manager) == []
+    assert calls == ["ATL", "MCO"]  # an answer, so not retried
+    assert all(e.state == CIRCUIT_CLOSED and e.consecutive_failures == 0 for e in manager.endpoints.values())
+
+
+def test_unusable_page_without_captcha_is_not_a_proxy_failure(proxies, monkeypatch):
+    def timed_out(origin, destination, date_str, timer=None, **kwargs):
+        timer.count("pages_loaded")
+        return None
+
+    monkeypatch.setattr(main, "search_frontier_flights", timed_out)
+    manager = ProxyManager(list(proxies), failure_threshold=2)
+    assert main.search_frontier_flights_with_retry("JFK", "ATL", "2030-01-01", max_retries=2,
+                                                   proxy_manager=manager) is None
+    assert all(e.state == CIRCUIT_CLOSED for e in manager.endpoints.values())
+
+
+def test_captcha_retry_moves_to_another_proxy(proxies, monkeypatch):
+    used = []
+
+    def blocked(origin, destination, date_str, proxy_server=None, **kwargs):
+        used.append(proxy_server)
+        raise main.CaptchaDetectedException(f"CAPTCHA detected with proxy {proxy_server}")
+
+    monkeypatch.setattr(main, "search_frontier_flights", blocked)
+    manager = ProxyManager(list(proxies))
+    monkeypatch.setattr(manager, "backoff", lambda attempt, base=2.0, cap=60.0: 0)
+    assert main.search_frontier_flights_with_retry("JFK", "ATL", "2030-01-01", max_retries=3,
+                                                   proxy_manager=manager) is None
+    assert sorted(used) == sorted(proxies)
@@ -0,0 +1,281 @@
+"""
+Non-interactive daemon that keeps a watchlist of routes fresh within a request budget.
+
+    python watchlist.py watchlist.json --rpm 6
+    python watchlist.py --route JFK-ATL --route DEN-LAS --start 2025-07-15 --days 14 --no-proxy
+
+watchlist.json holds entries like {"origin": "JFK", "destination": "ATL", "start": "2025-07-15", "days": 14}.
+Each (route, date) is re-searched on its own interval: shorter as departure nears
+(the fare cache TTL tiers), when its fares changed on recent checks, and when its
+GoWild seats are close to selling out.
+"""
+import argparse
+import heapq
+import json
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from change_tracker import ChangeTracker, changed_cells, describe_change
+from fare_cache import DEFAULT_TTL_TIERS, cache_key, ttl_for_date
+from fare_store import FareHistory, fare_records_from_cells
+from main import search_frontier_flights_with_retry
+
+# How quickly the change rate follows new observations (0..1)
+VOLATILITY_SMOOTHING = 0.3
+# Interval multipliers: a route that changed on every check is polled at
+# MIN_VOLATILITY_FACTOR x its TTL, one that never changes at MAX_VOLATILITY_FACTOR x
+MIN_VOLATILITY_FACTOR = 0.25
+MAX_VOLATILITY_FACTOR = 2.0
+# GoWild seats at or below this count mark a date as close to selling out
+LOW_SEATS_THRESHOLD = 3
+LOW_SEATS_FACTOR = 0.5
+# Bounds on any interval, in seconds
+MIN_INTERVAL = 2 * 60
+MAX_INTERVAL = 12 * 60 * 60
+# Wait after a failed search before trying that date again
+FAILURE_RETRY_SECONDS = 10 * 60
+
+_SEATS_RE = re.compile(r"(\d+)")
+
+
+class TokenBucket:
+    """Global requests-per-minute budget shared by every search the daemon starts."""
+
+    def __init__(self, requests_per_minute, burst=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1, int(requests_per_minute // 4))
+        self.tokens = float(self.capacity)
+        self.updated = time.time()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until_available(self):
+        with self._lock:
+            self._refill(time.time())
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Spend one request if the budget allows it; returns False otherwise."""
+        with self._lock:
+            self._refill(time.time())
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class WatchEntry:
+    """Scheduling state for one watched (origin, destination, date)."""
+
+    __slots__ = ('origin', 'destination', 'date', 'fare_type', 'change_rate', 'low_seats',
+                 'checks', 'next_due', 'last_checked')
+
+    def __init__(self, origin, destination, date_str, fare_type='DD'):
+        self.origin = origin
+        self.destination = destination
+        self.date = date_str
+        self.fare_type = fare_type
+        self.change_rate = 0.5  # unknown volatility starts in the middle
+        self.low_seats = False
+        self.checks = 0
+        self.next_due = 0.0
+        self.last_checked = None
+
+    @property
+    def key(self):
+        return cache_key(self.origin, self.destination, self.date, self.fare_type)
+
+
+def gowild_seats_low(fare_cells, threshold=LOW_SEATS_THRESHOLD):
+    """True when a bookable GoWild fare reports ``threshold`` or fewer seats left."""
+    for cell in fare_cells or []:
+        if cell.get('brandedFareClass') != 'GoWild' or cell.get('isSoldOut'):
+            continue
+        match = _SEATS_RE.search(str(cell.get('seatsRemaining') or ''))
+        if match and int(match.group(1)) <= threshold:
+            return True
+    return False
+
+
+def refresh_interval(entry, ttl_tiers=DEFAULT_TTL_TIERS, today=None):
+    """
+    Seconds until ``entry`` should be searched again.
+
+    The date-based TTL is scaled by observed volatility (between MIN_ and
+    MAX_VOLATILITY_FACTOR) and halved while GoWild seats are nearly gone.
+    """
+    interval = ttl_for_date(entry.date, ttl_tiers, today=today)
+    interval *= MAX_VOLATILITY_FACTOR - (MAX_VOLATILITY_FACTOR - MIN_VOLATILITY_FACTOR) * entry.change_rate
+    if entry.low_seats:
+        interval *= LOW_SEATS_FACTOR
+    return min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+
+
+class WatchlistDaemon:
+    """
+    Re-searches watched routes where prices move, within a global request budget.
+
+    Due entries run in order of how overdue they are relative to their interval,
+    one search at a time, each one spending a token from the requests-per-minute
+    budget. Results go through a ChangeTracker, so only changed fares reach the
+    FareHistory and each check updates the entry's volatility.
+    """
+
+    def __init__(self, entries, requests_per_minute=6, use_proxy=True, tracker=None, history=None,
+                 search_fn=None, ttl_tiers=DEFAULT_TTL_TIERS):
+        """
+        Args:
+            entries (list): WatchEntry objects to keep fresh.
+            requests_per_minute (float): Global search budget.
+            use_proxy (bool): Whether to use the rotating proxy endpoint.
+            tracker (ChangeTracker): Where fare states are compared (default: fare_changes.sqlite3).
+            history (FareHistory): Where changed fares are appended (default: fare_history/).
+            search_fn (callable): Override for the search, called as
+                                  ``search_fn(origin, destination, date_str, fare_type)``; returns
+                                  fares, ``[]`` for a date without flights, or None on failure.
+            ttl_tiers (list): (max_days_out, ttl_seconds) pairs, see fare_cache.ttl_for_date.
+        """
+        self.entries = {entry.key: entry for entry in entries}
+        self.budget = TokenBucket(requests_per_minute)
+        self.tracker = tracker or ChangeTracker()
+        self.history = history or FareHistory()
+        self.ttl_tiers = ttl_tiers
+        self.search_fn = search_fn or (lambda origin, destination, date_str, fare_type:
+                                       search_frontier_flights_with_retry(origin, destination, date_str,
+                                                                          use_proxy=use_proxy, max_retries=1,
+                                                                          fare_type=fare_type))
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _next_entry(self, now):
+        """The due entry that is most overdue relative to its interval, or None."""
+        today = date.today().isoformat()
+        due = []
+        for entry in list(self.entries.values()):
+            if entry.date < today:
+                del self.entries[entry.key]
+                continue
+            if entry.next_due <= now:
+                interval = refresh_interval(entry, self.ttl_tiers)
+                heapq.heappush(due, (-(now - entry.next_due) / interval, entry.date, entry.key))
+        return self.entries[due[0][2]] if due else None
+
+    def check(self, entry):
+        """Search one entry, record what changed and schedule its next check."""
+        now = time.time()
+        try:
+            fares = self.search_fn(entry.origin, entry.destination, entry.date, entry.fare_type)
+        except Exception as e:
+            print(f"❌ {entry.key} failed: {e}")
+            fares = None
+        if fares is None:
+            # Only errors and CAPTCHAs get the short retry; "no flights" ([]) is a normal observation
+            entry.next_due = now + FAILURE_RETRY_SECONDS
+            return None
+
+        observation = self.tracker.observe(entry.origin, entry.destination, entry.date, fares,
+                                           fare_type=entry.fare_type)
+        if not observation.first_seen:
+            changed = 0.0 if observation.unchanged else 1.0
+            entry.change_rate += VOLATILITY_SMOOTHING * (changed - entry.change_rate)
+        entry.checks += 1
+        entry.low_seats = gowild_seats_low(fares)
+        entry.last_checked = now
+        interval = refresh_interval(entry, self.ttl_tiers)
+        entry.next_due = now + interval
+
+        if observation.unchanged:
+            status = "still no flights" if not fares else "unchanged"
+            print(f"🟰 {entry.key} {status}; next check in {interval / 60:.0f} min")
+        else:
+            for change in observation.changes:
+                print(f"📈 {entry.key}: {describe_change(change)}")
+            cells = fares if observation.first_seen else changed_cells(fares, observation.changes)
+            if cells:
+                self.history.append(fare_records_from_cells(entry.origin, entry.destination, entry.date, cells))
+            print(f"🔁 {entry.key} volatility {entry.change_rate:.2f}; next check in {interval / 60:.0f} min")
+        return observation
+
+    def run(self, max_checks=None):
+        """
+        Keep checking due entries until stopped, the watchlist is exhausted, or ``max_checks`` ran.
+
+        Returns:
+            The number of searches made.
+        """
+        checks = 0
+        print(f"👀 Watching {len(self.entries)} route-dates at {self.budget.rate * 60:g} searches/min")
+        while not self._stop.is_set() and self.entries:
+            if max_checks is not None and checks >= max_checks:
+                break
+            now = time.time()
+            entry = self._next_entry(now)
+            if entry is None:
+                upcoming = min((e.next_due for e in self.entries.values()), default=now + 60)
+                self._stop.wait(min(60.0, max(0.5, upcoming - now)))
+                continue
+            wait_time = self.budget.seconds_until_available()
+            if wait_time > 0:
+                self._stop.wait(wait_time)
+                continue
+            if not self.budget.take():
+                continue
+            self.check(entry)
+            checks += 1
+        return checks
+
+
+def load_watchlist(path, fare_type='DD'):
+    """
+    Read watch entries from a JSON list of {"origin", "destination", "start", "days"} objects.
+
+    Returns:
+        A list of WatchEntry, one per route and date.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        items = json.load(f)
+    entries = []
+    for item in items:
+        entries.extend(watch_entries(item['origin'], item['destination'], item.get('start', date.today().isoformat()),
+                                     item.get('days', 1), item.get('fare_type', fare_type)))
+    return entries
+
+
+def watch_entries(origin, destination, start_date, days=1, fare_type='DD'):
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    return [WatchEntry(origin.upper(), destination.upper(), (start + timedelta(days=i)).strftime('%Y-%m-%d'),
+                       fare_type)
+            for i in range(days)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Keep a watchlist of routes fresh within a request budget.")
+    parser.add_argument("watchlist", nargs="?", help="JSON watchlist file")
+    parser.add_argument("--route", action="append", default=[], help="Extra route like JFK-ATL (repeatable)")
+    parser.add_argument("--start", default=date.today().isoformat(), help="First date for --route (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=7, help="Dates per --route")
+    parser.add_argument("--fare-type", default="DD")
+    parser.add_argument("--rpm", type=float, default=6, help="Global searches per minute")
+    parser.add_argument("--no-proxy", action="store_true")
+    parser.add_argument("--max-checks", type=int)
+    args = parser.parse_args()
+
+    watch = load_watchlist(args.watchlist, args.fare_type) if args.watchlist else []
+    for route in args.route:
+        route_origin, _, route_destination = route.partition('-')
+        watch += watch_entries(route_origin, route_destination, args.start, args.days, args.fare_type)
+    if not watch:
+        parser.error("Nothing to watch: give a watchlist file or --route")
+
+    daemon = WatchlistDaemon(watch, requests_per_minute=args.rpm, use_proxy=not args.no_proxy)
+    try:
+        daemon.run(max_checks=args.max_checks)
+    except KeyboardInterrupt:
+        print("\nStopping watchlist daemon")